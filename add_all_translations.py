@@ -4,8 +4,7 @@ Comprehensive translation script for Localizable.xcstrings
 Adds translations for all 40 languages to all 56+ keys
 """
 
-import json
-import sys
+import xcstrings_catalog
 
 # Complete translations dictionary for all 40 languages
 TRANSLATIONS = {
@@ -342,49 +341,15 @@ TRANSLATIONS = {
     }
 }
 
-def load_xcstrings(filepath):
-    """Load the Localizable.xcstrings file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_xcstrings(filepath, data):
-    """Save the Localizable.xcstrings file"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def source():
+    """This script's batch for xcstrings_catalog"""
+    return xcstrings_catalog.translation_source("add_all_translations", TRANSLATIONS, add_missing=False)
 
 def add_all_translations(filepath):
     """Add all translations to the xcstrings file"""
-    print(f"Loading {filepath}...")
-    data = load_xcstrings(filepath)
-    
-    translations_added = 0
-    keys_updated = 0
-    
-    for key, translations in TRANSLATIONS.items():
-        if key in data['strings']:
-            keys_updated += 1
-            if 'localizations' not in data['strings'][key]:
-                data['strings'][key]['localizations'] = {}
-            
-            for lang_code, translation in translations.items():
-                data['strings'][key]['localizations'][lang_code] = {
-                    "stringUnit": {
-                        "state": "translated",
-                        "value": translation
-                    }
-                }
-                translations_added += 1
-        else:
-            print(f"Warning: Key '{key}' not found in xcstrings file")
-    
-    print(f"Saving {filepath}...")
-    save_xcstrings(filepath, data)
-    
-    print(f"\n✅ Success!")
-    print(f"   Updated {keys_updated} keys")
-    print(f"   Added {translations_added} translations")
+    xcstrings_catalog.apply_sources(filepath, [source()])
     print(f"   Covering {len(set(lang for trans in TRANSLATIONS.values() for lang in trans.keys()))} languages")
 
 if __name__ == "__main__":
-    filepath = "/Users/blargou/Desktop/removebgpro/removebgpro/Localizable.xcstrings"
+    filepath = xcstrings_catalog.XCSTRINGS_PATH
     add_all_translations(filepath)
@@ -4,7 +4,7 @@ Script to add MISSING home screen translations to Localizable.xcstrings
 Fixes "Foto auswählen", "Aus Galerie wählen", and main title
 """
 
-import json
+import xcstrings_catalog
 
 # Additional translations for home screen elements
 TRANSLATIONS = {
@@ -54,63 +54,14 @@ TRANSLATIONS = {
     }
 }
 
-def load_xcstrings(filepath):
-    """Load the Localizable.xcstrings file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_xcstrings(filepath, data):
-    """Save the Localizable.xcstrings file"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def source():
+    """This script's batch for xcstrings_catalog"""
+    return xcstrings_catalog.translation_source("add_home_translations", TRANSLATIONS, add_missing=True)
 
 def add_missing_translations(filepath):
     """Add missing translations to the xcstrings file"""
-    print(f"Loading {filepath}...")
-    data = load_xcstrings(filepath)
-    
-    translations_added = 0
-    keys_updated = 0
-    
-    for key, translations in TRANSLATIONS.items():
-        if key in data['strings']:
-            keys_updated += 1
-            if 'localizations' not in data['strings'][key]:
-                data['strings'][key]['localizations'] = {}
-            
-            for lang_code, translation in translations.items():
-                # Only add if not already present or if we want to overwrite
-                # existing check handles partially filled keys
-                data['strings'][key]['localizations'][lang_code] = {
-                    "stringUnit": {
-                        "state": "translated",
-                        "value": translation
-                    }
-                }
-                translations_added += 1
-        else:
-            print(f"Adding new key '{key}'")
-            keys_updated += 1
-            data['strings'][key] = {
-                "extractionState": "manual",
-                "localizations": {}
-            }
-            for lang_code, translation in translations.items():
-                data['strings'][key]['localizations'][lang_code] = {
-                    "stringUnit": {
-                        "state": "translated",
-                        "value": translation
-                    }
-                }
-                translations_added += 1
-    
-    print(f"Saving {filepath}...")
-    save_xcstrings(filepath, data)
-    
-    print(f"\n✅ Success!")
-    print(f"   Updated {keys_updated} keys")
-    print(f"   Added {translations_added} translations")
+    xcstrings_catalog.apply_sources(filepath, [source()])
 
 if __name__ == "__main__":
-    filepath = "/Users/blargou/Desktop/removebgpro/removebgpro/Localizable.xcstrings"
+    filepath = xcstrings_catalog.XCSTRINGS_PATH
     add_missing_translations(filepath)
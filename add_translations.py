@@ -3,7 +3,7 @@
 Script to add translations for all 40 languages to Localizable.xcstrings
 """
 
-import json
+import xcstrings_catalog
 
 # All translation keys that need to be translated
 KEYS_TO_TRANSLATE = [
@@ -185,35 +185,14 @@ TRANSLATIONS = {
     # Add more languages here...
 }
 
-def load_localizable():
-    """Load the Localizable.xcstrings file"""
-    with open('/Users/blargou/Desktop/removebgpro/removebgpro/Localizable.xcstrings', 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_localizable(data):
-    """Save the Localizable.xcstrings file"""
-    with open('/Users/blargou/Desktop/removebgpro/removebgpro/Localizable.xcstrings', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def source():
+    """This script's batch for xcstrings_catalog, limited to KEYS_TO_TRANSLATE"""
+    translations = xcstrings_catalog.by_key(TRANSLATIONS, set(KEYS_TO_TRANSLATE))
+    return xcstrings_catalog.translation_source("add_translations", translations)
 
 def add_translations():
     """Add translations for all languages"""
-    data = load_localizable()
-    
-    for key in KEYS_TO_TRANSLATE:
-        if key in data['strings']:
-            for lang_code, translations in TRANSLATIONS.items():
-                if key in translations:
-                    if 'localizations' not in data['strings'][key]:
-                        data['strings'][key]['localizations'] = {}
-                    
-                    data['strings'][key]['localizations'][lang_code] = {
-                        "stringUnit": {
-                            "state": "translated",
-                            "value": translations[key]
-                        }
-                    }
-    
-    save_localizable(data)
+    xcstrings_catalog.apply_sources(xcstrings_catalog.XCSTRINGS_PATH, [source()])
     print(f"Added translations for {len(TRANSLATIONS)} languages")
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+import os
+import sys
+import zlib
+import time
+import struct
+import argparse
+import functools
+import numpy as np
+import sticker_batch
+import strip_processing
+from PIL import Image, ImageSequence
+from process_stickers import KEY_COLOR, KEY_TOLERANCE, KEY_MODE, KEY_MODES, KEY_SOFTNESS, make_transparent
+
+# Configuration
+ANIMATED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "animated_stickers")
+FORMATS = ("webp", "apng")
+DEFAULT_DURATION = 100 # ms; what browsers play GIF frames with no or a near-zero delay at
+GIF_MIN_DURATION = 10 # GIF delays up to this many ms get DEFAULT_DURATION; other formats keep theirs
+PIXEL_TOLERANCE = 8 # Per-channel difference below which a pixel counts as unchanged
+MAX_CHANGED_FRACTION = 0.001 # Frames with at most this share of changed pixels are merged into the previous one
+WEBP_QUALITY = 80
+WEBP_METHOD = 4
+
+# From the APNG specification
+APNG_DISPOSE_NONE = 0
+APNG_BLEND_SOURCE = 0
+
+def read_frames(img):
+    """Yield (RGBA image, duration in ms) one decoded frame at a time"""
+    for frame in ImageSequence.Iterator(img):
+        rgba = frame.convert("RGBA") # Decode first: WebP only fills in the frame duration on load
+        duration = round(frame.info.get("duration") or 0)
+        if img.format == "GIF" and duration <= GIF_MIN_DURATION:
+            duration = DEFAULT_DURATION
+        yield rgba, duration
+
+def nearly_equal(a, b, pixel_tolerance=PIXEL_TOLERANCE, max_changed=MAX_CHANGED_FRACTION):
+    changed = (np.abs(a.astype(np.int16) - b) > pixel_tolerance).any(axis=2)
+    return changed.mean() <= max_changed
+
+def merge_frames(frames, pixel_tolerance=PIXEL_TOLERANCE, max_changed=MAX_CHANGED_FRACTION):
+    """Fold runs of (near-)identical consecutive frames into one, summing their durations
+    
+    Only the frame being extended is held, so memory stays at two frames however long the run.
+    """
+    pending, pending_duration = None, 0
+    for arr, duration in frames:
+        if pending is not None and nearly_equal(arr, pending, pixel_tolerance, max_changed):
+            pending_duration += duration
+            continue
+        if pending is not None:
+            yield pending, pending_duration
+        pending, pending_duration = arr, duration
+    if pending is not None:
+        yield pending, pending_duration
+
+class ApngWriter:
+    """Streams an animated PNG frame by frame, storing only the rectangle that changed
+    
+    The frame count in acTL is unknown until the end, so it is patched in on close.
+    """
+    
+    def __init__(self, path, size, loop=0, compress_level=9):
+        self.width, self.height = size
+        self.compress_level = compress_level
+        self.loop = loop
+        self.file = open(path, "wb")
+        self.previous = None
+        self.frames = 0
+        self.sequence = 0
+        self.file.write(strip_processing.PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0))
+        self.actl_offset = self.file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, loop))
+    
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+    
+    def _next_sequence(self):
+        self.sequence += 1
+        return self.sequence - 1
+    
+    def write(self, arr, duration):
+        """Append an HxWx4 RGBA frame shown for duration ms"""
+        x0, y0, x1, y1 = 0, 0, self.width, self.height
+        if self.previous is not None:
+            changed = (arr != self.previous).any(axis=2)
+            rows, cols = np.nonzero(changed.any(axis=1))[0], np.nonzero(changed.any(axis=0))[0]
+            if len(rows):
+                y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            else:
+                x1, y1 = 1, 1 # Nothing changed; still emit a frame to keep its delay
+        
+        region = np.ascontiguousarray(arr[y0:y1, x0:x1]).reshape(y1 - y0, -1)
+        filtered = strip_processing.filter_rows(region, np.zeros(region.shape[1], dtype=np.uint8))
+        data = zlib.compress(filtered.tobytes(), self.compress_level)
+        
+        # Delays are 16-bit fractions; fall back to centiseconds for very long merged frames
+        numerator, denominator = (duration, 1000) if duration <= 0xFFFF else (min(duration // 10, 0xFFFF), 100)
+        self._chunk(b"fcTL", struct.pack(">IIIIIHHBB", self._next_sequence(), x1 - x0, y1 - y0, x0, y0,
+                                         numerator, denominator, APNG_DISPOSE_NONE, APNG_BLEND_SOURCE))
+        if self.frames == 0:
+            self._chunk(b"IDAT", data)
+        else:
+            self._chunk(b"fdAT", struct.pack(">I", self._next_sequence()) + data)
+        self.previous = arr
+        self.frames += 1
+    
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            if self.frames == 0:
+                raise ValueError("Animation has no frames")
+            self._chunk(b"IEND", b"")
+            self.file.seek(self.actl_offset)
+            self._chunk(b"acTL", struct.pack(">II", self.frames, self.loop))
+        finally:
+            self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+def animate_sticker(source_file, output_format="webp", key_color=KEY_COLOR, tolerance=KEY_TOLERANCE,
+                    key_mode=KEY_MODE, softness=KEY_SOFTNESS, lossless=False):
+    name = os.path.splitext(os.path.basename(source_file))[0]
+    print(f"Processing {name}...")
+    os.makedirs(ANIMATED_PATH, exist_ok=True)
+    
+    img = Image.open(source_file)
+    frames_in = getattr(img, "n_frames", 1)
+    loop = img.info.get("loop", 0)
+    keyed = (
+        (np.asarray(make_transparent(frame, key_color, tolerance, key_mode, softness)), duration)
+        for frame, duration in read_frames(img)
+    )
+    
+    # APNG is written straight from the frame stream. For WebP it doubles as a spool that Pillow's
+    # encoder reads back one frame at a time, so neither path ever holds the whole animation.
+    apng_file = os.path.join(ANIMATED_PATH, f"{name}.png" if output_format == "apng" else f".{name}.tmp.png")
+    durations = []
+    with ApngWriter(apng_file, img.size, loop, compress_level=9 if output_format == "apng" else 1) as writer:
+        for arr, duration in merge_frames(keyed):
+            writer.write(arr, duration)
+            durations.append(duration)
+    img.close()
+    
+    output_file = apng_file
+    if output_format == "webp":
+        output_file = os.path.join(ANIMATED_PATH, f"{name}.webp")
+        try:
+            with Image.open(apng_file) as spool:
+                spool.save(output_file, "WEBP", save_all=True, duration=durations, loop=loop,
+                           lossless=lossless, quality=WEBP_QUALITY, method=WEBP_METHOD, allow_mixed=not lossless)
+        finally:
+            os.remove(apng_file)
+    
+    size = os.path.getsize(output_file)
+    print(f"Wrote {os.path.basename(output_file)}: {len(durations)} of {frames_in} frames, {size / 1024:.1f} KB")
+    return {"frames_in": frames_in, "frames_out": len(durations), "bytes": size}
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Key animated GIF/APNG/WebP stickers frame by frame")
+    parser.add_argument("inputs", nargs="+", help="Animated GIF, APNG or WebP files")
+    parser.add_argument("-j", "--jobs", type=int, default=sticker_batch.default_jobs(),
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=FORMATS, default="webp", help="Output container")
+    parser.add_argument("--lossless", action="store_true", help="Lossless WebP frames")
+    parser.add_argument("--key-mode", choices=KEY_MODES, default=KEY_MODE,
+                        help="global: key every near-key pixel; border: only background connected to the edge")
+    parser.add_argument("--softness", type=int, default=KEY_SOFTNESS,
+                        help="Soft matte: ramp alpha over this many levels past the tolerance (0 = hard key)")
+    args = parser.parse_args()
+    
+    func = functools.partial(animate_sticker, output_format=args.format, key_mode=args.key_mode,
+                             softness=args.softness, lossless=args.lossless)
+    start = time.perf_counter()
+    results = sticker_batch.run_batch(func, args.inputs, args.jobs)
+    if not sticker_batch.print_summary(results, 0, time.perf_counter() - start, noun="animations"):
+        sys.exit(1)
+    print("Done.")
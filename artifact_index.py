@@ -0,0 +1,39 @@
+import os
+import re
+
+# Generated artwork is saved as <name>_<millisecond timestamp>.png. The timestamp is always 13 digits, so
+# names that end in a short number (sticker_top_10) keep it instead of having it read as a timestamp.
+ARTIFACT_PATTERN = re.compile(r"^(?P<name>.+?)(?:_(?P<timestamp>\d{13}))?\.png$")
+
+_indexes = {}
+
+def scan_artifacts(path):
+    """One pass over path: map sticker name to its candidate files, newest first"""
+    index = {}
+    if not os.path.isdir(path):
+        return index # Nothing generated yet; every lookup reports the sticker as not found
+    with os.scandir(path) as entries:
+        for entry in entries:
+            match = ARTIFACT_PATTERN.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            timestamp = match.group("timestamp")
+            # Timestamped files beat untimestamped ones; the file name breaks any remaining tie
+            rank = (timestamp is not None, int(timestamp or 0), entry.name)
+            index.setdefault(match.group("name"), []).append((rank, entry.path))
+    
+    for name, candidates in index.items():
+        candidates.sort(reverse=True)
+        index[name] = [path for _, path in candidates]
+    return index
+
+def artifact_index(path, refresh=False):
+    """Index for path, scanned once per process"""
+    if refresh or path not in _indexes:
+        _indexes[path] = scan_artifacts(path)
+    return _indexes[path]
+
+def find_artifact(path, name):
+    """Newest generated file for name in path, or None"""
+    candidates = artifact_index(path).get(name)
+    return candidates[0] if candidates else None
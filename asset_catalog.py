@@ -0,0 +1,85 @@
+import os
+import json
+from PIL import Image
+
+import strip_processing
+
+# Configuration
+SCALES = (1, 2, 3)
+SOURCE_SCALE = 3 # Generated artwork is drawn at @3x; smaller renditions are resampled from it
+
+def rendition_filename(name, scale):
+    return f"{name}.png" if scale == 1 else f"{name}@{scale}x.png"
+
+def write_contents_json(dest_dir, filenames):
+    """Write an .imageset Contents.json; filenames maps scale (1, 2, 3) to a file or None"""
+    images = []
+    for scale in SCALES:
+        image = {}
+        if filenames.get(scale):
+            image["filename"] = filenames[scale]
+        image["idiom"] = "universal"
+        image["scale"] = f"{scale}x"
+        images.append(image)
+    
+    contents = {
+        "images": images,
+        "info": {
+            "author": "xcode",
+            "version": 1
+        }
+    }
+    
+    with open(os.path.join(dest_dir, "Contents.json"), "w") as f:
+        json.dump(contents, f, indent=4)
+
+def rendition_size(size, scale, source_scale=SOURCE_SCALE):
+    width, height = size
+    return (max(1, round(width * scale / source_scale)),
+            max(1, round(height * scale / source_scale)))
+
+def render_scales(img, scales=SCALES, source_scale=SOURCE_SCALE):
+    """Resample one decoded RGBA image into every scale, each straight from the full-size buffer"""
+    renditions = {}
+    premultiplied = None
+    for scale in scales:
+        size = rendition_size(img.size, scale, source_scale)
+        if size == img.size:
+            renditions[scale] = img
+            continue
+        if premultiplied is None:
+            # Resample with premultiplied alpha so transparent pixels don't bleed into edges
+            premultiplied = img.convert("RGBa")
+        renditions[scale] = premultiplied.resize(size, Image.LANCZOS).convert("RGBA")
+    return renditions
+
+def save_renditions(renditions, dest_dir, name):
+    """Save renditions as name.png / name@2x.png / name@3x.png and return {scale: filename}"""
+    filenames = {}
+    for scale, img in renditions.items():
+        filename = rendition_filename(name, scale)
+        img.save(os.path.join(dest_dir, filename), "PNG")
+        filenames[scale] = filename
+    return filenames
+
+def save_renditions_in_strips(img, dest_dir, name, rows, box=None, key_func=None, scales=SCALES,
+                              source_scale=SOURCE_SCALE):
+    """Like render_scales + save_renditions on img.crop(box), but keys, resamples and encodes a strip at a time
+
+    rows is the strip height in source rows; key_func(arr, x0, y0) is applied to every source region.
+    """
+    box = box or (0, 0) + img.size
+    box_size = (box[2] - box[0], box[3] - box[1])
+    filenames = {}
+    for scale in scales:
+        size = rendition_size(box_size, scale, source_scale)
+        if size == box_size:
+            strips = strip_processing.crop_in_strips(img, rows, box, key_func)
+        else:
+            # Fewer output rows per strip so each strip still reads about `rows` source rows
+            out_rows = max(1, rows * size[1] // box_size[1])
+            strips = strip_processing.resize_in_strips(img, size, out_rows, box, key_func)
+        filename = rendition_filename(name, scale)
+        strip_processing.save_strips(os.path.join(dest_dir, filename), size, strips)
+        filenames[scale] = filename
+    return filenames
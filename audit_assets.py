@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import numpy as np
+import sticker_batch
+import json_cache
+from PIL import Image
+from process_stickers import ASSETS_PATH
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCES_PATH = os.path.dirname(ASSETS_PATH)
+AUDIT_CACHE_PATH = os.path.join(SCRIPT_DIR, ".asset_audit_cache.json")
+AUDIT_CACHE_VERSION = 1 # Bump when describe_image changes
+HASH_SIZE = 8 # dHash grid; 8 gives a 64-bit hash
+DUPLICATE_DISTANCE = 4 # Max differing hash bits for two images to count as near-duplicates
+
+# Largest on-screen size, in points, of each image set family; None means drawn at arbitrary size
+DISPLAY_SIZES = {
+    "instagram": 24, # CanvasTabView ratio icons
+    "tiktok": 24,
+    "facebook": 24,
+    "filter_": 44, # FilterTabView thumbnails
+    "gradient_": 44, # ColorsTabView GradientCircle
+    "sticker_": None # Placed and scaled freely on the canvas
+}
+
+# Literals only count as image set references where the app loads an asset: Image("…"),
+# UIImage(named: "…"), `return "…"` in name properties, and bare elements of name arrays
+LITERAL = r'"((?:[^"\\]|\\.)*)"'
+LOADING_PATTERN = re.compile(r'(?:\bImage\(\s*(?:decorative:\s*)?|\bUIImage\(\s*named:\s*|\breturn\s+)' + LITERAL)
+ELEMENT_PATTERN = re.compile(r'^\s*' + LITERAL + r'\s*,?\s*(?://.*)?$', re.MULTILINE)
+
+def display_size(name):
+    for prefix, points in DISPLAY_SIZES.items():
+        if name.startswith(prefix):
+            return points
+    return None
+
+def difference_hash(img):
+    """64-bit dHash of the image composited onto grey, as an int"""
+    grey = Image.new("RGBA", img.size, (128, 128, 128, 255))
+    grey.alpha_composite(img.convert("RGBA"))
+    small = np.asarray(grey.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+def describe_image(path):
+    """Everything the audit needs from one image file; runs in a worker process"""
+    with Image.open(path) as img:
+        img.load()
+        return {
+            "size": list(img.size),
+            "bytes": os.path.getsize(path),
+            "sha256": json_cache.file_hash(path),
+            "dhash": f"{difference_hash(img):016x}"
+        }
+
+def scan_imagesets(assets_path=ASSETS_PATH):
+    """Map of image set name to its Contents.json images that have a file"""
+    imagesets = {}
+    for dest_dir in sorted(glob.glob(os.path.join(assets_path, "*.imageset"))):
+        name = os.path.basename(dest_dir)[:-len(".imageset")]
+        try:
+            with open(os.path.join(dest_dir, "Contents.json"), "r") as f:
+                images = json.load(f).get("images", [])
+        except (OSError, ValueError):
+            images = []
+        imagesets[name] = [
+            {"path": os.path.join(dest_dir, image["filename"]), "scale": image.get("scale")}
+            for image in images if image.get("filename")
+        ]
+    return imagesets
+
+def load_cache(path=None):
+    return json_cache.load_cache(path or AUDIT_CACHE_PATH, AUDIT_CACHE_VERSION, "images")
+
+def describe_all(paths, jobs=None, cache_path=None):
+    """Describe every image, hashing only files whose size or mtime changed since the last audit"""
+    cache = load_cache(cache_path)
+    entries = cache["images"]
+    stats = {path: os.stat(path) for path in paths}
+    stale = [
+        path for path in paths
+        if entries.get(path, {}).get("mtime_ns") != stats[path].st_mtime_ns
+        or entries[path].get("bytes") != stats[path].st_size
+    ]
+    
+    results = sticker_batch.run_batch(describe_image, stale, jobs)
+    errors = {}
+    for path, (ok, error, description) in results.items():
+        if ok:
+            entries[path] = dict(description, mtime_ns=stats[path].st_mtime_ns)
+        else:
+            entries.pop(path, None)
+            errors[path] = error
+    
+    # Forget files that no longer exist so the cache doesn't grow forever
+    cache["images"] = {path: entries[path] for path in paths if path in entries}
+    if stale:
+        json_cache.save_cache(cache, cache_path or AUDIT_CACHE_PATH)
+    return cache["images"], errors, len(stale)
+
+def find_duplicates(descriptions, max_distance=DUPLICATE_DISTANCE):
+    """Groups of files that are identical or perceptually near-identical"""
+    paths = sorted(descriptions)
+    hashes = np.array([int(descriptions[p]["dhash"], 16) for p in paths], dtype=np.uint64)
+    parent = list(range(len(paths)))
+    
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i in range(len(paths)):
+        # Hamming distance from this hash to every later one at once
+        xor = hashes[i + 1:] ^ hashes[i]
+        distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        for j in np.nonzero(distances <= max_distance)[0]:
+            parent[root(i + 1 + int(j))] = root(i)
+    
+    groups = {}
+    for i, path in enumerate(paths):
+        groups.setdefault(root(i), []).append(path)
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_oversized(imagesets, descriptions):
+    """Renditions with more pixels than their slot can ever show"""
+    oversized = []
+    for name, images in imagesets.items():
+        points = display_size(name)
+        if points is None:
+            continue
+        for image in images:
+            description = descriptions.get(image["path"])
+            if not description:
+                continue
+            # A lone rendition is stretched to every device scale, so allow the largest one
+            scale = int(image["scale"].rstrip("x")) if image["scale"] and len(images) > 1 else 3
+            limit = points * scale
+            if max(description["size"]) > limit:
+                oversized.append((image["path"], description["size"], limit))
+    return oversized
+
+def swift_literals(sources_path=SOURCES_PATH):
+    """Asset names the Swift sources load, plus the fixed prefixes of interpolated ones"""
+    literals, prefixes = set(), set()
+    for path in glob.glob(os.path.join(sources_path, "**", "*.swift"), recursive=True):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            source = f.read()
+        for literal in LOADING_PATTERN.findall(source):
+            if "\\(" in literal:
+                # Only asset loads contribute prefixes; a temp file name like "sticker_\(UUID()).png" must not
+                prefixes.add(literal.split("\\(", 1)[0])
+            else:
+                literals.add(literal)
+        literals.update(literal for literal in ELEMENT_PATTERN.findall(source) if "\\(" not in literal)
+    prefixes.discard("")
+    return literals, prefixes
+
+def find_unreferenced(imagesets, sources_path=SOURCES_PATH):
+    literals, prefixes = swift_literals(sources_path)
+    return [
+        name for name in imagesets
+        if name not in literals and not any(name.startswith(prefix) for prefix in prefixes)
+    ]
+
+def audit(assets_path=ASSETS_PATH, sources_path=SOURCES_PATH, jobs=None, cache_path=None):
+    imagesets = scan_imagesets(assets_path)
+    paths = sorted({image["path"] for images in imagesets.values() for image in images if os.path.exists(image["path"])})
+    missing = sorted({image["path"] for images in imagesets.values() for image in images} - set(paths))
+    descriptions, errors, rehashed = describe_all(paths, jobs, cache_path)
+    return {
+        "imagesets": len(imagesets),
+        "images": len(paths),
+        "rehashed": rehashed,
+        "duplicates": find_duplicates(descriptions),
+        "oversized": find_oversized(imagesets, descriptions),
+        "unreferenced": find_unreferenced(imagesets, sources_path),
+        "missing": missing,
+        "errors": errors
+    }
+
+def print_report(report, elapsed, assets_path=ASSETS_PATH):
+    def short(path):
+        return os.path.relpath(path, assets_path)
+    
+    print(f"Audited {report['images']} images in {report['imagesets']} image sets in {elapsed:.2f}s "
+          f"({report['rehashed']} hashed, {report['images'] - report['rehashed']} cached)")
+    
+    print(f"\nDuplicate groups: {len(report['duplicates'])}")
+    for group in report["duplicates"]:
+        print(f"   - {', '.join(short(p) for p in group)}")
+    
+    print(f"\nOversized images: {len(report['oversized'])}")
+    for path, size, limit in report["oversized"]:
+        print(f"   - {short(path)}: {size[0]}x{size[1]}, never shown above {limit}px")
+    
+    print(f"\nUnreferenced image sets: {len(report['unreferenced'])}")
+    for name in report["unreferenced"]:
+        print(f"   - {name}")
+    
+    for path in report["missing"]:
+        print(f"Warning: {short(path)} is listed in Contents.json but missing")
+    for path, error in sorted(report["errors"].items()):
+        print(f"Error: Could not read {short(path)}: {error}")
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit Assets.xcassets for duplicates, oversized and unused images")
+    parser.add_argument("-j", "--jobs", type=int, default=sticker_batch.default_jobs(),
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if anything was found")
+    args = parser.parse_args()
+    
+    if not os.path.exists(ASSETS_PATH):
+        print(f"Error: Assets path not found at {ASSETS_PATH}")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    report = audit(jobs=args.jobs)
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print_report(report, time.perf_counter() - start)
+    
+    findings = report["duplicates"] or report["oversized"] or report["unreferenced"] or report["missing"]
+    if report["errors"] or (args.strict and findings):
+        sys.exit(1)
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import argparse
+import outline
+import gradient_image
+from PIL import Image, ImageColor, ImageFilter
+
+# Configuration
+OUTLINE_BASELINE = 512.0 # Outline widths are given for a 512px wide canvas and scaled from there
+SHADOW_BASELINE = 1000.0 # Shadow radius and offsets are given for a 1000px canvas
+
+def parse_color(value, opacity=1.0):
+    """'#RRGGBB', a CSS colour name or an [r, g, b(, a)] list, as an RGBA tuple"""
+    if isinstance(value, str):
+        rgb = ImageColor.getrgb(value)
+    else:
+        rgb = tuple(value)
+    alpha = rgb[3] if len(rgb) == 4 else 255
+    return rgb[0], rgb[1], rgb[2], round(alpha * opacity)
+
+def _transformed_rect(x, y, width, height, canvas_size, scale, offset):
+    """Apply the editor's 'scale about the canvas centre, then offset' transform to a rect"""
+    cx, cy = canvas_size[0] / 2, canvas_size[1] / 2
+    return (cx + offset[0] + scale * (x - cx), cy + offset[1] + scale * (y - cy),
+            width * scale, height * scale)
+
+def _draw(canvas, img, rect):
+    x, y, width, height = rect
+    size = (max(1, round(width)), max(1, round(height)))
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS)
+    layer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
+    layer.paste(img, (round(x), round(y)))
+    canvas.alpha_composite(layer)
+
+class Compositor:
+    """Renders ImageProcessor.composite for many jobs, caching everything that repeats between them"""
+    
+    def __init__(self):
+        self.images = {} # path -> decoded RGBA image
+        self.gradients = {} # (colours, size) -> gradient image
+        self.outlined = {} # (path, width, colour) -> outlined foreground
+        self.shadows = {} # (path, rect, canvas, outline, radius) -> blurred alpha mask
+        self.hits = 0
+    
+    def _cached(self, cache, key, build):
+        if key in cache:
+            self.hits += 1
+        else:
+            cache[key] = build()
+        return cache[key]
+    
+    def load(self, path):
+        return self._cached(self.images, path, lambda: Image.open(path).convert("RGBA"))
+    
+    def background(self, spec, size):
+        """A background from an image path, a colour, or a list of gradient colours"""
+        if isinstance(spec, list):
+            key = (tuple(json.dumps(c) for c in spec), size)
+            return self._cached(self.gradients, key, lambda: gradient_image.create_gradient_image([parse_color(c) for c in spec], size))
+        if isinstance(spec, str) and os.path.exists(spec):
+            return self.load(spec)
+        return Image.new("RGBA", size, parse_color(spec))
+    
+    def composite(self, foreground, background, output_size=None, shadow_radius=0, shadow_x=0, shadow_y=0,
+                  shadow_color="#000000", shadow_opacity=0.3, fg_scale=1.0, fg_offset=(0, 0),
+                  bg_scale=1.0, bg_offset=(0, 0), ui_canvas_size=None, outline_width=0,
+                  outline_color="#FFFFFF"):
+        fg = self.load(foreground)
+        size = tuple(output_size or fg.size)
+        pixel_scale = size[0] / ui_canvas_size[0] if ui_canvas_size and ui_canvas_size[0] > 0 else 1.0
+        canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+        
+        # 1. Background: aspect fill, then the user's scale/offset about the centre
+        bg = self.background(background, size)
+        base_scale = max(size[0] / bg.width, size[1] / bg.height)
+        bg_width, bg_height = bg.width * base_scale, bg.height * base_scale
+        rect = ((size[0] - bg_width) / 2, (size[1] - bg_height) / 2, bg_width, bg_height)
+        offset = (bg_offset[0] * pixel_scale, bg_offset[1] * pixel_scale)
+        _draw(canvas, bg, _transformed_rect(*rect, size, bg_scale, offset))
+        
+        # 2. Foreground: aspect fit, then the user's scale/offset about the centre
+        fit = min(size[0] / fg.width, size[1] / fg.height)
+        fg_width, fg_height = fg.width * fit, fg.height * fit
+        rect = ((size[0] - fg_width) / 2, (size[1] - fg_height) / 2, fg_width, fg_height)
+        offset = (fg_offset[0] * pixel_scale, fg_offset[1] * pixel_scale)
+        fg_rect = _transformed_rect(*rect, size, fg_scale, offset)
+        
+        if outline_width > 0:
+            width = outline_width * (size[0] / OUTLINE_BASELINE)
+            key = (foreground, width, outline_color)
+            fg = self._cached(self.outlined, key,
+                              lambda: outline.apply_outline(fg, width, parse_color(outline_color)[:3]))
+        
+        # 3. Shadow: the placed foreground's alpha, blurred, tinted and offset
+        if shadow_radius > 0 or shadow_x != 0 or shadow_y != 0:
+            factor = max(size) / SHADOW_BASELINE
+            key = (foreground, tuple(round(v, 3) for v in fg_rect), size, outline_width, outline_color,
+                   shadow_radius * factor)
+            mask = self._cached(self.shadows, key, lambda: self._shadow_mask(fg, fg_rect, size, shadow_radius * factor))
+            shadow = Image.new("RGBA", size, parse_color(shadow_color)[:3] + (0,))
+            shadow.putalpha(mask.point(lambda a: round(a * shadow_opacity)))
+            layer = Image.new("RGBA", size, (0, 0, 0, 0))
+            layer.paste(shadow, (round(shadow_x * factor), round(shadow_y * factor)))
+            canvas.alpha_composite(layer)
+        
+        _draw(canvas, fg, fg_rect)
+        return canvas
+    
+    def _shadow_mask(self, fg, rect, size, radius):
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        _draw(layer, fg, rect)
+        mask = layer.getchannel("A")
+        if radius > 0:
+            mask = mask.filter(ImageFilter.GaussianBlur(radius / 2)) # CoreGraphics blur is roughly 2 sigma
+        return mask
+
+def render_jobs(jobs, output_path):
+    """Render a list of job dicts: {"output": name, "foreground": path, "background": ..., params...}"""
+    compositor = Compositor()
+    os.makedirs(output_path, exist_ok=True)
+    failed = 0
+    for job in jobs:
+        params = dict(job)
+        output = params.pop("output")
+        try:
+            img = compositor.composite(**params)
+            img.save(os.path.join(output_path, output), "PNG")
+        except Exception as e:
+            failed += 1
+            print(f"Failed to render {output}: {e}")
+    return compositor, failed
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render ImageProcessor.composite previews for a JSON list of jobs")
+    parser.add_argument("jobs", help="JSON file with a list of composite jobs")
+    parser.add_argument("output", help="Folder to write the rendered PNGs into")
+    args = parser.parse_args()
+    
+    with open(args.jobs, "r") as f:
+        jobs = json.load(f)
+    start = time.perf_counter()
+    compositor, failed = render_jobs(jobs, args.output)
+    print(f"Rendered {len(jobs) - failed} of {len(jobs)} previews in {time.perf_counter() - start:.2f}s "
+          f"({compositor.hits} cache hits)")
+    if failed:
+        sys.exit(1)
+    print("Done.")
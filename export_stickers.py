@@ -0,0 +1,109 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import functools
+import sticker_batch
+from PIL import Image
+from process_stickers import STICKER_NAMES
+from make_whatsapp_stickers import OUTPUT_PATH as WHATSAPP_PATH
+
+# Configuration
+EXPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "whatsapp_export")
+REPORT_FILE = "export_report.json"
+MAX_BYTES = 100 * 1024 # WhatsApp rejects static stickers over 100 KB
+MAX_ATTEMPTS = 8 # Lossless try + 7 bisection steps covers every quality from 0 to 100
+WEBP_METHOD = 6 # Slowest, smallest encoder setting; it runs on a build box, not a phone
+
+def encode_webp(img, quality=None):
+    """Encode to WebP in memory; quality None means lossless"""
+    buffer = io.BytesIO()
+    if quality is None:
+        img.save(buffer, "WEBP", lossless=True, quality=100, method=WEBP_METHOD)
+    else:
+        img.save(buffer, "WEBP", quality=quality, method=WEBP_METHOD)
+    return buffer.getvalue()
+
+def fit_to_budget(img, max_bytes=MAX_BYTES, max_attempts=MAX_ATTEMPTS):
+    """Find the best encoding under max_bytes with at most max_attempts encodes
+
+    Lossless is tried first; otherwise the highest lossy quality that fits is found by bisection.
+    Returns (data, quality, attempts) where data is None if even quality 0 is too large.
+    """
+    data = encode_webp(img)
+    attempts = 1
+    if len(data) <= max_bytes:
+        return data, "lossless", attempts
+    
+    best, best_quality = None, None
+    lo, hi = 0, 100
+    while lo <= hi and attempts < max_attempts:
+        quality = (lo + hi + 1) // 2
+        data = encode_webp(img, quality)
+        attempts += 1
+        if len(data) <= max_bytes:
+            best, best_quality = data, quality
+            lo = quality + 1
+        else:
+            hi = quality - 1
+    return best, best_quality, attempts
+
+def export_sticker(name, max_bytes=MAX_BYTES, max_attempts=MAX_ATTEMPTS):
+    source_file = os.path.join(WHATSAPP_PATH, f"{name}.png")
+    if not os.path.exists(source_file):
+        print(f"Error: {source_file} not found, run make_whatsapp_stickers.py first")
+        return False
+    
+    img = Image.open(source_file).convert("RGBA")
+    data, quality, attempts = fit_to_budget(img, max_bytes, max_attempts)
+    if data is None:
+        raise ValueError(f"no quality fits in {max_bytes // 1024} KB after {attempts} attempts")
+    
+    os.makedirs(EXPORT_PATH, exist_ok=True)
+    with open(os.path.join(EXPORT_PATH, f"{name}.webp"), "wb") as f:
+        f.write(data)
+    print(f"Exported {name}: {len(data) / 1024:.1f} KB (quality {quality}, {attempts} encodes)")
+    return {"bytes": len(data), "quality": quality, "attempts": attempts}
+
+def write_report(results, max_bytes):
+    report = {
+        "max_bytes": max_bytes,
+        "stickers": {
+            name: entry if ok else {"error": error}
+            for name, (ok, error, entry) in sorted(results.items())
+        }
+    }
+    with open(os.path.join(EXPORT_PATH, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=4)
+
+def print_report(results):
+    print(f"\n{'Sticker':<32} {'Size':>9} {'Quality':>9} {'Encodes':>8}")
+    for name, (ok, error, entry) in sorted(results.items()):
+        if ok:
+            print(f"{name:<32} {entry['bytes'] / 1024:>7.1f}KB {str(entry['quality']):>9} {entry['attempts']:>8}")
+        else:
+            print(f"{name:<32} {'FAILED':>9}")
+
+# Main execution
+if __name__ == "__main__":
+    parser = sticker_batch.add_batch_arguments(argparse.ArgumentParser(
+        description="Encode WhatsApp stickers to WebP under the static sticker size limit"), cached=False)
+    parser.add_argument("--max-kb", type=int, default=MAX_BYTES // 1024,
+                        help="Size budget per sticker in KB")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help="Maximum number of encodes per sticker")
+    args = parser.parse_args()
+    
+    max_bytes = args.max_kb * 1024
+    func = functools.partial(export_sticker, max_bytes=max_bytes, max_attempts=args.max_attempts)
+    start = time.perf_counter()
+    results = sticker_batch.run_batch(func, args.names or STICKER_NAMES, args.jobs)
+    
+    os.makedirs(EXPORT_PATH, exist_ok=True)
+    write_report(results, max_bytes)
+    print_report(results)
+    if not sticker_batch.print_summary(results, 0, time.perf_counter() - start):
+        sys.exit(1)
+    print("Done.")
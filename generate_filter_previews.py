@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import numpy as np
+import asset_catalog
+from PIL import Image, ImageFilter
+from process_stickers import ASSETS_PATH
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LUT_CACHE_PATH = os.path.join(SCRIPT_DIR, ".lut_cache")
+CUBE_PATH = os.path.join(SCRIPT_DIR, "filter_luts")
+REFERENCE_IMAGE = os.path.join(ASSETS_PATH, "filter_none.imageset", "image.png")
+LUT_SIZE = 33
+LUT_VERSION = 1 # Bump when the colour operations below change
+
+# ImageProcessor.applyFilter, one entry per FilterType, as data.
+# "sharpen" is spatial and cannot live in a LUT; it is applied after the LUT.
+FILTER_RECIPES = {
+    "none": [],
+    "losangeles": [
+        ("color_controls", {"saturation": 1.3, "brightness": 0.02}),
+        ("temperature_tint", {"neutral": [6500, 0], "target": [7500, 0]})
+    ],
+    "paris": [
+        ("color_controls", {"brightness": 0.05, "saturation": 1.1}),
+        ("temperature_tint", {"neutral": [6500, 0], "target": [5800, 10]})
+    ],
+    "tokyo": [
+        ("color_controls", {"contrast": 1.25, "saturation": 1.1}),
+        ("temperature_tint", {"neutral": [6500, 0], "target": [4800, 0]})
+    ],
+    "london": [
+        ("color_controls", {"saturation": 0.6, "contrast": 0.9}),
+        ("temperature_tint", {"neutral": [6500, 0], "target": [5200, 0]})
+    ],
+    "newyork": [
+        ("noir", {}),
+        ("color_controls", {"contrast": 1.5})
+    ],
+    "milan": [
+        ("color_controls", {"saturation": 1.6, "contrast": 1.1}),
+        ("sharpen", {"sharpness": 0.8})
+    ],
+    "sepia": [
+        ("sepia", {"intensity": 0.8})
+    ],
+    "dramatic": [
+        ("chrome", {}),
+        ("color_controls", {"contrast": 1.2})
+    ]
+}
+
+LUMA = np.array([0.2125, 0.7154, 0.0721]) # CoreImage's luminance weights
+
+def srgb_to_linear(c):
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(c):
+    c = np.clip(c, 0.0, 1.0)
+    return np.where(c <= 0.0031308, c * 12.92, 1.055 * c ** (1 / 2.4) - 0.055)
+
+def kelvin_to_rgb(kelvin):
+    """White point of a black body in linear RGB, normalised to green (Tanner Helland's fit)"""
+    t = kelvin / 100.0
+    r = 255.0 if t <= 66 else 329.698727446 * (t - 60) ** -0.1332047592
+    g = 99.4708025861 * np.log(t) - 161.1195681661 if t <= 66 else 288.1221695283 * (t - 60) ** -0.0755148492
+    b = 255.0 if t >= 66 else (0.0 if t <= 19 else 138.5177312231 * np.log(t - 10) - 305.0447927307)
+    rgb = srgb_to_linear(np.clip(np.array([r, g, b]), 0, 255) / 255.0)
+    return rgb / rgb[1]
+
+def color_controls(rgb, saturation=1.0, brightness=0.0, contrast=1.0):
+    """CIColorControls: saturation about luminance, then brightness offset, then contrast about mid grey"""
+    luma = (rgb @ LUMA)[..., np.newaxis]
+    rgb = luma + (rgb - luma) * saturation
+    rgb = rgb + brightness
+    return (rgb - 0.5) * contrast + 0.5
+
+def temperature_tint(rgb, neutral, target):
+    """CITemperatureAndTint: re-balance so the neutral white point renders like the target one"""
+    gains = kelvin_to_rgb(neutral[0]) / kelvin_to_rgb(target[0])
+    gains = gains * np.array([1.0, 1.0 - 0.002 * (target[1] - neutral[1]), 1.0]) # Positive tint leans magenta
+    return linear_to_srgb(srgb_to_linear(np.clip(rgb, 0, 1)) * gains)
+
+def noir(rgb):
+    """CIPhotoEffectNoir: luminance with a gentle S-curve"""
+    luma = np.clip(rgb @ LUMA, 0, 1)
+    curve = luma - 0.25 * np.sin(2 * np.pi * luma) / (2 * np.pi)
+    return np.repeat(curve[..., np.newaxis], 3, axis=-1)
+
+def chrome(rgb):
+    """CIPhotoEffectChrome: richer saturation with a slight contrast lift"""
+    return color_controls(rgb, saturation=1.25, contrast=1.08)
+
+def sepia(rgb, intensity=1.0):
+    """CISepiaTone: blend towards the classic sepia matrix"""
+    matrix = np.array([[0.393, 0.769, 0.189],
+                       [0.349, 0.686, 0.168],
+                       [0.272, 0.534, 0.131]])
+    return rgb + (rgb @ matrix.T - rgb) * intensity
+
+COLOR_OPERATIONS = {
+    "color_controls": color_controls,
+    "temperature_tint": temperature_tint,
+    "noir": noir,
+    "chrome": chrome,
+    "sepia": sepia
+}
+
+def recipe_key(name):
+    definition = json.dumps([LUT_VERSION, LUT_SIZE, FILTER_RECIPES[name]], sort_keys=True)
+    return hashlib.sha256(definition.encode()).hexdigest()[:16]
+
+def build_lut(name, size=LUT_SIZE):
+    """Sample the colour part of a recipe on a size^3 lattice; returns (size, size, size, 3) float32 [r, g, b]"""
+    axis = np.linspace(0.0, 1.0, size)
+    rgb = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    for op, params in FILTER_RECIPES[name]:
+        if op in COLOR_OPERATIONS:
+            rgb = COLOR_OPERATIONS[op](rgb, **params)
+    return np.clip(rgb, 0.0, 1.0).astype(np.float32)
+
+def load_lut(name):
+    """LUT for a recipe, cached on disk by the hash of its definition"""
+    path = os.path.join(LUT_CACHE_PATH, f"{name}-{recipe_key(name)}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+    lut = build_lut(name)
+    os.makedirs(LUT_CACHE_PATH, exist_ok=True)
+    np.save(path, lut)
+    return lut
+
+def apply_lut(arr, lut):
+    """Trilinear lookup of an (H, W, 3) uint8 image through an (N, N, N, 3) LUT"""
+    n = lut.shape[0]
+    flat = lut.reshape(-1, 3)
+    pos = arr.reshape(-1, 3).astype(np.float32) * np.float32((n - 1) / 255.0)
+    i0 = np.minimum(pos.astype(np.intp), n - 2)
+    f = pos - i0
+    base = (i0[:, 0] * n + i0[:, 1]) * n + i0[:, 2]
+    fr, fg, fb = f[:, 0:1], f[:, 1:2], f[:, 2:3]
+    
+    def corner(dr, dg, db):
+        return np.take(flat, base + (dr * n + dg) * n + db, axis=0)
+    
+    # Interpolate along blue, then green, then red
+    c00 = corner(0, 0, 0) + (corner(0, 0, 1) - corner(0, 0, 0)) * fb
+    c01 = corner(0, 1, 0) + (corner(0, 1, 1) - corner(0, 1, 0)) * fb
+    c10 = corner(1, 0, 0) + (corner(1, 0, 1) - corner(1, 0, 0)) * fb
+    c11 = corner(1, 1, 0) + (corner(1, 1, 1) - corner(1, 1, 0)) * fb
+    c0 = c00 + (c01 - c00) * fg
+    c1 = c10 + (c11 - c10) * fg
+    out = c0 + (c1 - c0) * fr
+    return np.round(out * 255.0).astype(np.uint8).reshape(arr.shape)
+
+def write_cube(name, lut):
+    """Export a LUT as an Adobe/Resolve .cube file (red varies fastest)"""
+    os.makedirs(CUBE_PATH, exist_ok=True)
+    n = lut.shape[0]
+    with open(os.path.join(CUBE_PATH, f"{name}.cube"), "w") as f:
+        f.write(f'TITLE "{name}"\n')
+        f.write(f"LUT_3D_SIZE {n}\n")
+        rows = lut.transpose(2, 1, 0, 3).reshape(-1, 3)
+        f.writelines(f"{r:.6f} {g:.6f} {b:.6f}\n" for r, g, b in rows)
+
+def render_preview(name, reference):
+    img = Image.fromarray(apply_lut(reference, load_lut(name)), "RGB")
+    for op, params in FILTER_RECIPES[name]:
+        if op == "sharpen":
+            # CISharpenLuminance has no LUT form; an unsharp mask on the result stands in for it
+            img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=int(params["sharpness"] * 100), threshold=0))
+    return img
+
+def generate_previews(names, reference_path=REFERENCE_IMAGE, export_cube=True):
+    reference = np.asarray(Image.open(reference_path).convert("RGB"))
+    for name in names:
+        img = render_preview(name, reference)
+        dest_dir = os.path.join(ASSETS_PATH, f"filter_{name}.imageset")
+        os.makedirs(dest_dir, exist_ok=True)
+        img.save(os.path.join(dest_dir, "image.png"), "PNG")
+        asset_catalog.write_contents_json(dest_dir, {1: "image.png"})
+        if export_cube:
+            write_cube(name, load_lut(name))
+        print(f"Generated filter_{name}")
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the filter preview thumbnails from 3D colour LUTs")
+    parser.add_argument("--reference", default=REFERENCE_IMAGE,
+                        help="Photo the filters are applied to (default: the unfiltered preview)")
+    parser.add_argument("--no-cube", action="store_true", help="Skip writing .cube files")
+    parser.add_argument("names", nargs="*", help=f"Filters to render (default: all of {', '.join(FILTER_RECIPES)})")
+    args = parser.parse_args()
+    
+    names = args.names or [name for name in FILTER_RECIPES if name != "none"]
+    unknown = [name for name in names if name not in FILTER_RECIPES]
+    if unknown:
+        print(f"Error: unknown filter(s) {', '.join(unknown)}")
+        sys.exit(1)
+    if not os.path.exists(args.reference):
+        print(f"Error: Reference image not found at {args.reference}")
+        sys.exit(1)
+    generate_previews(names, args.reference, not args.no_cube)
+    print("Done.")
@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import asset_catalog
+import gradient_image
+import json_cache
+import sticker_cache
+from PIL import ImageColor
+from process_stickers import ASSETS_PATH
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GRADIENTS_PATH = os.path.join(SCRIPT_DIR, "gradients.json")
+GRADIENT_MANIFEST_PATH = os.path.join(SCRIPT_DIR, ".gradient_manifest.json")
+GRADIENT_VERSION = 1 # Bump when render_gradient changes
+GRADIENT_MANIFEST_VERSION = 1
+
+def definition_hash(definition):
+    """Stable hash of a gradient definition plus everything else that shapes the output"""
+    payload = json.dumps({"definition": definition, "version": GRADIENT_VERSION, "scales": asset_catalog.SCALES},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def render_gradient(definition, size):
+    """One gradient definition at size pixels; start/end are unit points, stops default to even spacing"""
+    return gradient_image.create_gradient_image(
+        [ImageColor.getrgb(c)[:3] for c in definition["colors"]], size, definition.get("locations"),
+        definition.get("start", gradient_image.DEFAULT_START), definition.get("end", gradient_image.DEFAULT_END))
+
+def write_gradient(name, definition, assets_path=ASSETS_PATH):
+    """Render every scale of one gradient into its .imageset and return the written filenames"""
+    dest_dir = os.path.join(assets_path, f"{name}.imageset")
+    os.makedirs(dest_dir, exist_ok=True)
+    width, height = definition["size"]
+    filenames = {}
+    for scale in asset_catalog.SCALES:
+        filename = asset_catalog.rendition_filename(name, scale)
+        render_gradient(definition, (width * scale, height * scale)).save(os.path.join(dest_dir, filename), "PNG")
+        filenames[scale] = filename
+    
+    # Drop renditions from an earlier, hand-made version of the set
+    for filename in os.listdir(dest_dir):
+        if filename.endswith(".png") and filename not in filenames.values():
+            os.remove(os.path.join(dest_dir, filename))
+    asset_catalog.write_contents_json(dest_dir, filenames)
+    return dest_dir
+
+def load_manifest(path=None):
+    return json_cache.load_cache(path or GRADIENT_MANIFEST_PATH, GRADIENT_MANIFEST_VERSION, "gradients")
+
+def save_manifest(manifest, path=None):
+    json_cache.save_cache(manifest, path or GRADIENT_MANIFEST_PATH)
+
+def is_hand_made(name, dest_dir):
+    """True for an existing image set holding PNGs this script would not write, like a designer's image.png"""
+    if not os.path.isdir(dest_dir):
+        return False
+    generated = {asset_catalog.rendition_filename(name, scale) for scale in asset_catalog.SCALES}
+    return any(filename.endswith(".png") and filename not in generated for filename in os.listdir(dest_dir))
+
+def generate_gradients(definitions, names=None, force=False, assets_path=ASSETS_PATH, manifest_path=None,
+                       replace=False):
+    """Render changed gradients; hand-made image sets are only overwritten with replace"""
+    manifest = load_manifest(manifest_path)
+    entries = manifest["gradients"]
+    written, skipped, kept = [], [], []
+    for name in names or sorted(definitions):
+        if name not in definitions:
+            print(f"Error: No gradient definition for {name}")
+            return None
+        digest = definition_hash(definitions[name])
+        dest_dir = os.path.join(assets_path, f"{name}.imageset")
+        if not replace and is_hand_made(name, dest_dir):
+            kept.append(name)
+            continue
+        entry = entries.get(name)
+        if (not force and entry and entry.get("definition") == digest
+                and sticker_cache.output_hashes(dest_dir) == entry.get("outputs")):
+            skipped.append(name)
+            continue
+        write_gradient(name, definitions[name], assets_path)
+        entries[name] = {"definition": digest, "outputs": sticker_cache.output_hashes(dest_dir)}
+        written.append(name)
+    save_manifest(manifest, manifest_path)
+    return written, skipped, kept
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render gradient background image sets from gradients.json")
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild gradients even if unchanged")
+    parser.add_argument("--replace", action="store_true",
+                        help="Overwrite image sets that hold hand-made artwork instead of keeping them")
+    parser.add_argument("--definitions", default=GRADIENTS_PATH, help="Gradient definition file")
+    parser.add_argument("names", nargs="*", help="Only these gradients (default: all)")
+    args = parser.parse_args()
+    
+    with open(args.definitions, "r") as f:
+        definitions = json.load(f)
+    result = generate_gradients(definitions, args.names, args.force, replace=args.replace)
+    if result is None:
+        sys.exit(1)
+    written, skipped, kept = result
+    for name in written:
+        print(f"Rendered {name}")
+    for name in kept:
+        print(f"Kept hand-made {name}.imageset (use --replace to overwrite it)")
+    print(f"{len(written)} rendered, {len(skipped)} unchanged")
+    print("Done.")
@@ -0,0 +1,34 @@
+import numpy as np
+from PIL import Image
+
+# Configuration
+DEFAULT_START = (0.5, 0.0) # ImageProcessor.createGradientImage draws top to bottom
+DEFAULT_END = (0.5, 1.0)
+
+def create_gradient_image(stops, size, locations=None, start=DEFAULT_START, end=DEFAULT_END):
+    """ImageProcessor.createGradientImage over the whole pixel grid at once
+    
+    stops are RGB or RGBA tuples; locations default to even spacing like CGGradient with nil locations.
+    start/end are unit points. As with CGContext.drawLinearGradient, each pixel takes the colour at its
+    centre projected onto the start -> end axis, and the end colours extend beyond it.
+    """
+    width, height = size
+    colors = np.array(stops, dtype=np.float64)
+    if len(colors) == 1:
+        colors, locations = np.vstack([colors, colors]), None
+    if locations is None:
+        locations = np.linspace(0.0, 1.0, len(colors))
+    
+    sx, sy = start
+    ex, ey = end
+    dx, dy = (ex - sx) * width, (ey - sy) * height
+    length = dx * dx + dy * dy or 1.0
+    x = (np.arange(width) + 0.5 - sx * width) * (dx / length)
+    y = (np.arange(height) + 0.5 - sy * height) * (dy / length)
+    t = np.clip(y[:, np.newaxis] + x[np.newaxis, :], 0.0, 1.0)
+    
+    channels = colors.shape[1]
+    arr = np.empty((height, width, channels), dtype=np.uint8)
+    for c in range(channels):
+        arr[..., c] = np.round(np.interp(t, locations, colors[:, c]))
+    return Image.fromarray(arr, "RGBA" if channels == 4 else "RGB")
@@ -1,8 +1,10 @@
 
 import os
 import shutil
-import json
-import glob
+import artifact_index
+import asset_catalog
+import sticker_batch
+import sticker_cache
 
 # Configuration
 ASSETS_PATH = "/Users/blargou/Desktop/removebgpro/removebgpro/Assets.xcassets"
@@ -14,18 +16,24 @@ STICKER_NAMES = [
     "sticker_wow_bubble"
 ]
 
+def find_artifact(name):
+    return artifact_index.find_artifact(ARTIFACTS_PATH, name)
+
+def sticker_params():
+    return {"pipeline": "import_stickers"}
+
+def plan_sticker(name):
+    return find_artifact(name), sticker_params(), os.path.join(ASSETS_PATH, f"{name}.imageset")
+
 def import_sticker(name):
     print(f"Importing {name}...")
     
-    # 1. Find the artifact file (generated with timestamp suffix)
-    pattern = os.path.join(ARTIFACTS_PATH, f"{name}*.png")
-    matches = glob.glob(pattern)
+    # 1. Find the artifact file
+    source_file = find_artifact(name)
     
-    if not matches:
+    if not source_file:
         print(f"Error: Could not find generated image for {name}")
-        return
-        
-    source_file = matches[0] # Take the first match
+        return False
     
     # 2. Create Destination Directory
     dest_dir = os.path.join(ASSETS_PATH, f"{name}.imageset")
@@ -38,38 +46,12 @@ def import_sticker(name):
     shutil.copy2(source_file, dest_file)
     
     # 4. Create Contents.json
-    contents = {
-        "images": [
-            {
-                "filename": f"{name}.png",
-                "idiom": "universal",
-                "scale": "1x"
-            },
-             {
-                "idiom": "universal",
-                "scale": "2x"
-            },
-             {
-                "idiom": "universal",
-                "scale": "3x"
-            }
-        ],
-        "info": {
-            "author": "xcode",
-            "version": 1
-        }
-    }
-    
-    with open(os.path.join(dest_dir, "Contents.json"), "w") as f:
-        json.dump(contents, f, indent=4)
+    asset_catalog.write_contents_json(dest_dir, {1: f"{name}.png"})
         
     print(f"Successfully imported {name}")
+    return sticker_cache.build_entry(source_file, sticker_params(), dest_dir)
 
 # Main execution
 if __name__ == "__main__":
-    if not os.path.exists(ASSETS_PATH):
-        print(f"Error: Assets path not found at {ASSETS_PATH}")
-    else:
-        for name in STICKER_NAMES:
-            import_sticker(name)
-        print("Done.")
+    sticker_batch.main(import_sticker, STICKER_NAMES, ASSETS_PATH, plan=plan_sticker,
+                       description="Copy generated sticker artwork into Assets.xcassets")
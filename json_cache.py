@@ -0,0 +1,29 @@
+import os
+import json
+import hashlib
+
+def file_hash(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_cache(path, version, *sections):
+    """Versioned JSON cache holding only the given sections; missing, unreadable or outdated files start empty"""
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict) or cache.get("version") != version:
+        cache = {}
+    return dict({section: cache.get(section, {}) for section in sections}, version=version)
+
+def save_cache(cache, path):
+    """Write the cache through a temp file so an interrupted run never leaves it half written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
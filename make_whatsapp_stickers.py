@@ -0,0 +1,72 @@
+import os
+import argparse
+import functools
+import asset_catalog
+import outline
+import sticker_batch
+from PIL import Image, ImageColor
+from process_stickers import ASSETS_PATH, STICKER_NAMES
+
+# Configuration
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "whatsapp_stickers")
+TARGET_SIZE = 512 # WhatsApp static stickers are exactly 512x512
+MARGIN = 16 # WhatsApp requires at least 16px of margin
+OUTLINE_WIDTH = 8
+OUTLINE_COLOR = "#FFFFFF"
+
+def generate_sticker_image(img, target_size=TARGET_SIZE, outline_width=0, outline_color=(255, 255, 255)):
+    """Port of ImageProcessor.generateStickerImage: fit, outline and centre on a square canvas"""
+    img = img.convert("RGBA")
+    
+    # 1. Reserve room for the margin and the outline
+    outline_padding = outline_width + 4 if outline_width > 0 else 0
+    total_padding = max(MARGIN, outline_padding)
+    
+    # 2. Scale the image so image + outline + margin fits within target_size
+    available = target_size - total_padding * 2
+    scale = min(available / img.width, available / img.height)
+    scaled_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    scaled = img.resize(scaled_size, Image.LANCZOS)
+    
+    # 3. Apply the outline (grows the canvas by outline_width + 4 on each side)
+    outlined = outline.apply_outline(scaled, outline_width, outline_color)
+    
+    # 4. Centre on an exactly target_size x target_size canvas
+    canvas = Image.new("RGBA", (target_size, target_size), (0, 0, 0, 0))
+    x = (target_size - outlined.width) // 2
+    y = (target_size - outlined.height) // 2
+    canvas.alpha_composite(outlined, (x, y))
+    return canvas
+
+def source_rendition(name):
+    """Largest rendition of an imported sticker"""
+    filename = asset_catalog.rendition_filename(name, max(asset_catalog.SCALES))
+    return os.path.join(ASSETS_PATH, f"{name}.imageset", filename)
+
+def make_whatsapp_sticker(name, outline_width=OUTLINE_WIDTH, outline_color=OUTLINE_COLOR):
+    source_file = source_rendition(name)
+    if not os.path.exists(source_file):
+        print(f"Error: {name} has not been imported yet ({source_file} missing)")
+        return False
+    
+    img = Image.open(source_file)
+    sticker = generate_sticker_image(img, outline_width=outline_width,
+                                     outline_color=ImageColor.getrgb(outline_color))
+    os.makedirs(OUTPUT_PATH, exist_ok=True)
+    sticker.save(os.path.join(OUTPUT_PATH, f"{name}.png"), "PNG")
+    print(f"Generated WhatsApp sticker {name}")
+    return True
+
+def bind_options(args):
+    func = functools.partial(make_whatsapp_sticker, outline_width=args.outline_width,
+                             outline_color=args.outline_color)
+    return func, None
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render 512x512 WhatsApp sticker images for the imported sticker pack")
+    parser.add_argument("--outline-width", type=float, default=OUTLINE_WIDTH,
+                        help="Outline width in pixels (0 for none)")
+    parser.add_argument("--outline-color", default=OUTLINE_COLOR,
+                        help="Outline colour, e.g. #FFFFFF")
+    sticker_batch.main(make_whatsapp_sticker, STICKER_NAMES, ASSETS_PATH, parser=parser, bind=bind_options)
@@ -0,0 +1,166 @@
+import io
+import os
+import sys
+import glob
+import time
+import argparse
+import functools
+import numpy as np
+import sticker_batch
+import sticker_cache
+import generate_gradients
+from PIL import Image
+from process_stickers import ASSETS_PATH
+
+# Configuration
+TIME_BUDGET = 2.0 # Seconds per image; remaining candidates are skipped once it is spent
+TRANSPARENT = (0, 0, 0, 0) # Every fully transparent pixel is rewritten to this value
+MAX_PALETTE_ERROR = 0 # Largest per-channel change a lossy palette may make; 0 keeps --palette lossless
+
+def normalize_transparent(arr):
+    """Give all fully transparent pixels the same RGB so they compress as one long run"""
+    arr = arr.copy()
+    arr[arr[..., 3] == 0] = TRANSPARENT
+    return arr
+
+def encode_png(img, **options):
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG", optimize=True, **options)
+    return buffer.getvalue()
+
+def palette_image(arr):
+    """Lossless palette version of an RGBA array, or None if it has more than 256 colours"""
+    flat = arr.reshape(-1, 4)
+    packed = flat.view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    img = Image.fromarray(indices.astype(np.uint8).reshape(arr.shape[:2]), "P")
+    img.putpalette(palette[:, :3].tobytes())
+    return img, palette[:, 3].tobytes()
+
+def pixel_error(img, arr):
+    """Largest per-channel difference between img and the RGBA array it was made from"""
+    decoded = normalize_transparent(np.asarray(img.convert("RGBA")))
+    return int(np.abs(decoded.astype(np.int16) - arr).max())
+
+def quantized_image(arr, max_error):
+    """Lossy 256-colour palette version of an RGBA array, or None if some pixel moves by more than max_error"""
+    img = Image.fromarray(arr, "RGBA").quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    return img if pixel_error(img, arr) <= max_error else None
+
+def candidates(arr, palette, max_error=MAX_PALETTE_ERROR):
+    """Yield (label, encoder) pairs, cheapest and most likely to win first"""
+    if (arr[..., 3] == 255).all():
+        yield "rgb", lambda: encode_png(Image.fromarray(arr[..., :3], "RGB"))
+    else:
+        yield "rgba", lambda: encode_png(Image.fromarray(arr, "RGBA"))
+    if palette:
+        indexed = palette_image(arr)
+        if indexed is not None:
+            img, alphas = indexed
+            yield "palette", lambda: encode_png(img, transparency=alphas)
+        elif max_error > 0:
+            quantized = quantized_image(arr, max_error)
+            if quantized is not None:
+                yield "palette-lossy", lambda: encode_png(quantized)
+
+def optimize_png(path, palette=False, time_budget=TIME_BUDGET, max_error=MAX_PALETTE_ERROR):
+    """Recompress one PNG in place if a smaller encoding is found within the time budget
+
+    Encodings are lossless unless max_error allows a quantized palette to move pixels by that much.
+    """
+    start = time.perf_counter()
+    before = os.path.getsize(path)
+    arr = normalize_transparent(np.asarray(Image.open(path).convert("RGBA")))
+    
+    best, best_label = None, None
+    for label, encode in candidates(arr, palette, max_error):
+        if best is not None and time.perf_counter() - start > time_budget:
+            break
+        data = encode()
+        if best is None or len(data) < len(best):
+            best, best_label = data, label
+    
+    if len(best) < before:
+        # Never trust an encoder blindly: the result must decode to the same pixels, or within max_error
+        if pixel_error(Image.open(io.BytesIO(best)), arr) <= max_error:
+            with open(path, "wb") as f:
+                f.write(best)
+        else:
+            best_label = None
+    after = os.path.getsize(path)
+    return {"before": before, "after": after, "encoding": best_label if after < before else None,
+            "seconds": time.perf_counter() - start}
+
+def optimize_imageset(dest_dir, palette=False, time_budget=TIME_BUDGET, max_error=MAX_PALETTE_ERROR):
+    results = {}
+    for path in sorted(glob.glob(os.path.join(dest_dir, "*.png"))):
+        results[os.path.basename(path)] = optimize_png(path, palette, time_budget, max_error)
+    return results
+
+def refresh_manifest(results):
+    """Re-record output hashes for cached stickers and gradients so their scripts don't treat them as stale"""
+    for module, section in ((sticker_cache, "stickers"), (generate_gradients, "gradients")):
+        manifest = module.load_manifest()
+        entries = manifest[section]
+        changed = False
+        for dest_dir, (ok, _, files) in results.items():
+            name = os.path.splitext(os.path.basename(dest_dir))[0]
+            entry = entries.get(name)
+            if ok and entry and any(f["after"] < f["before"] for f in files.values()):
+                entry["outputs"] = sticker_cache.output_hashes(dest_dir)
+                changed = True
+        if changed:
+            module.save_manifest(manifest)
+
+def print_report(results, elapsed):
+    total_before = total_after = 0
+    print(f"\n{'Image':<48} {'Before':>9} {'After':>9} {'Time':>7}")
+    for dest_dir, (ok, error, files) in sorted(results.items()):
+        imageset = os.path.basename(dest_dir)
+        if not ok:
+            print(f"{imageset:<48} FAILED: {error}")
+            continue
+        for filename, r in files.items():
+            total_before += r["before"]
+            total_after += r["after"]
+            label = f"{imageset}/{filename}"
+            print(f"{label:<48} {r['before'] / 1024:>7.1f}KB {r['after'] / 1024:>7.1f}KB {r['seconds']:>6.2f}s")
+    saved = total_before - total_after
+    percent = 100 * saved / total_before if total_before else 0
+    print(f"\nTotal: {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB "
+          f"(saved {saved / 1024:.1f} KB, {percent:.1f}%) in {elapsed:.2f}s")
+
+# Main execution
+if __name__ == "__main__":
+    parser = sticker_batch.add_batch_arguments(argparse.ArgumentParser(
+        description="Shrink the PNGs in every .imageset of Assets.xcassets (losslessly by default)"), cached=False)
+    parser.add_argument("--palette", action="store_true",
+                        help="Also try an indexed palette for images with 256 colours or fewer")
+    parser.add_argument("--max-palette-error", type=int, default=MAX_PALETTE_ERROR,
+                        help="With --palette, also quantize images with more colours to 256 when no channel of any "
+                             "pixel changes by more than this (default: 0, lossless only)")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="Seconds per image before remaining candidates are skipped")
+    args = parser.parse_args()
+    
+    if not os.path.exists(ASSETS_PATH):
+        print(f"Error: Assets path not found at {ASSETS_PATH}")
+        sys.exit(1)
+    
+    if args.names:
+        imagesets = [os.path.join(ASSETS_PATH, f"{name}.imageset") for name in args.names]
+    else:
+        imagesets = sorted(glob.glob(os.path.join(ASSETS_PATH, "*.imageset")))
+    
+    func = functools.partial(optimize_imageset, palette=args.palette, time_budget=args.time_budget,
+                             max_error=args.max_palette_error)
+    start = time.perf_counter()
+    results = sticker_batch.run_batch(func, imagesets, args.jobs)
+    refresh_manifest(results)
+    print_report(results, time.perf_counter() - start)
+    if any(not ok for ok, _, _ in results.values()):
+        sys.exit(1)
+    print("Done.")
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import math
+import argparse
+import asset_catalog
+from PIL import Image
+from process_stickers import ASSETS_PATH, STICKER_NAMES
+
+# Configuration
+ATLAS_NAME = "sticker_atlas"
+# Atlases duplicate every sticker, so they live outside Assets.xcassets and are only shipped by whatever copies them
+ATLAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sticker_atlases")
+INDEX_FILENAME = f"{ATLAS_NAME}.json"
+MAX_ATLAS_PIXELS = 4096 # Largest texture side at the highest scale
+PADDING = 2 # Points of transparent gutter around every sticker so filtering never bleeds
+
+class SkylinePacker:
+    """Bottom-left skyline bin packing of rectangles into one fixed-size bin"""
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.skyline = [[0, 0, width]] # Segments of [x, y, width], left to right
+    
+    def _fit(self, index, width, height):
+        """Top y if a width x height rect is placed at the left edge of segment index, else None"""
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+        y = 0
+        remaining = width
+        while remaining > 0:
+            seg_x, seg_y, seg_width = self.skyline[index]
+            y = max(y, seg_y)
+            if y + height > self.height:
+                return None
+            remaining -= seg_width
+            index += 1
+        return y
+    
+    def insert(self, width, height):
+        """Place a rect and return its (x, y), or None if it does not fit"""
+        best = None
+        for index in range(len(self.skyline)):
+            y = self._fit(index, width, height)
+            if y is not None:
+                key = (y + height, self.skyline[index][0])
+                if best is None or key < best[0]:
+                    best = (key, index, y)
+        if best is None:
+            return None
+        
+        _, index, y = best
+        x = self.skyline[index][0]
+        self.skyline.insert(index, [x, y + height, width])
+        
+        # Trim or drop the segments now covered by the new one
+        i = index + 1
+        while i < len(self.skyline):
+            seg = self.skyline[i]
+            covered = x + width - seg[0]
+            if covered <= 0:
+                break
+            if covered >= seg[2]:
+                del self.skyline[i]
+            else:
+                seg[0] += covered
+                seg[2] -= covered
+                break
+        
+        # Merge neighbours of equal height
+        i = 0
+        while i < len(self.skyline) - 1:
+            if self.skyline[i][1] == self.skyline[i + 1][1]:
+                self.skyline[i][2] += self.skyline.pop(i + 1)[2]
+            else:
+                i += 1
+        return x, y
+
+def load_sticker(name):
+    """All renditions of an imported sticker, keyed by scale"""
+    dest_dir = os.path.join(ASSETS_PATH, f"{name}.imageset")
+    renditions = {}
+    for scale in asset_catalog.SCALES:
+        path = os.path.join(dest_dir, asset_catalog.rendition_filename(name, scale))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found, run process_stickers.py first")
+        renditions[scale] = Image.open(path).convert("RGBA")
+    return renditions
+
+def point_size(renditions):
+    """Cell size in points, large enough for every rendition at its scale"""
+    return (max(math.ceil(img.width / scale) for scale, img in renditions.items()),
+            max(math.ceil(img.height / scale) for scale, img in renditions.items()))
+
+def pack(sizes, bin_size):
+    """Pack {name: (w, h)} into as many bins as needed; returns a list of {name: (x, y)}"""
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+    bins = []
+    for name in order:
+        w, h = sizes[name]
+        if w > bin_size or h > bin_size:
+            raise ValueError(f"{name} ({w}x{h} points) is larger than an atlas ({bin_size} points)")
+        for packer, placements in bins:
+            position = packer.insert(w, h)
+            if position is not None:
+                placements[name] = position
+                break
+        else:
+            packer = SkylinePacker(bin_size, bin_size)
+            bins.append((packer, {name: packer.insert(w, h)}))
+    return [placements for _, placements in bins]
+
+def atlas_files(output_path, atlas):
+    return [os.path.join(output_path, asset_catalog.rendition_filename(atlas, scale)) for scale in asset_catalog.SCALES]
+
+def pack_stickers(names, output_path=ATLAS_PATH):
+    print(f"Packing {len(names)} stickers...")
+    stickers = {name: load_sticker(name) for name in names}
+    cells = {}
+    for name, renditions in stickers.items():
+        w, h = point_size(renditions)
+        cells[name] = (w + 2 * PADDING, h + 2 * PADDING)
+    
+    bin_size = MAX_ATLAS_PIXELS // max(asset_catalog.SCALES)
+    bins = pack(cells, bin_size)
+    
+    os.makedirs(output_path, exist_ok=True)
+    index = {"atlases": [], "stickers": {}}
+    for number, placements in enumerate(bins):
+        atlas = f"{ATLAS_NAME}_{number}"
+        width = max(x + cells[name][0] for name, (x, y) in placements.items())
+        height = max(y + cells[name][1] for name, (x, y) in placements.items())
+        
+        for scale, path in zip(asset_catalog.SCALES, atlas_files(output_path, atlas)):
+            canvas = Image.new("RGBA", (width * scale, height * scale), (0, 0, 0, 0))
+            for name, (x, y) in placements.items():
+                img = stickers[name][scale]
+                canvas.paste(img, ((x + PADDING) * scale, (y + PADDING) * scale))
+            canvas.save(path, "PNG")
+        
+        for name, (x, y) in sorted(placements.items()):
+            renditions = stickers[name]
+            base = renditions[1]
+            index["stickers"][name] = {
+                "atlas": atlas,
+                "rect": [x + PADDING, y + PADDING, base.width, base.height],
+                "frames": {
+                    f"{scale}x": [(x + PADDING) * scale, (y + PADDING) * scale, img.width, img.height]
+                    for scale, img in renditions.items()
+                }
+            }
+        index["atlases"].append({"name": atlas, "size": [width, height]})
+        print(f"   {atlas}: {len(placements)} stickers, {width}x{height} points")
+    
+    # Drop atlases left over from a previous, larger pack
+    number = len(bins)
+    while any(os.path.exists(path) for path in atlas_files(output_path, f"{ATLAS_NAME}_{number}")):
+        for path in atlas_files(output_path, f"{ATLAS_NAME}_{number}"):
+            if os.path.exists(path):
+                os.remove(path)
+        number += 1
+    
+    index_path = os.path.join(output_path, INDEX_FILENAME)
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=4, sort_keys=True)
+    print(f"Wrote {index_path}")
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack imported stickers into texture atlases with a JSON index")
+    parser.add_argument("names", nargs="*", help="Sticker names to pack (default: all of STICKER_NAMES)")
+    parser.add_argument("--output", default=ATLAS_PATH,
+                        help="Directory for the atlas PNGs and index (kept out of Assets.xcassets)")
+    args = parser.parse_args()
+    
+    if not os.path.exists(ASSETS_PATH):
+        print(f"Error: Assets path not found at {ASSETS_PATH}")
+        sys.exit(1)
+    pack_stickers(args.names or STICKER_NAMES, args.output)
+    print("Done.")
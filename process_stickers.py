@@ -2,7 +2,14 @@
 import os
 import shutil
 import json
-import glob
+import argparse
+import functools
+import artifact_index
+import asset_catalog
+import sticker_batch
+import sticker_cache
+import strip_processing
+import numpy as np
 from PIL import Image
 
 # Configuration
@@ -16,84 +23,299 @@ STICKER_NAMES = [
     "sticker_omg_text",
     "sticker_100_score"
 ]
+KEY_COLOR = (255, 255, 255)
+KEY_TOLERANCE = 14 # Per-channel distance from KEY_COLOR, 14 keeps the old "> 240" rule for white
+KEY_SOFTNESS = 0 # Width of the alpha ramp beyond KEY_TOLERANCE; 0 is the hard key
+KEY_MODE = "global" # "global" keys every matching pixel, "border" only background connected to the image edge
+KEY_MODES = ("global", "border")
+TRIM_PADDING = 0 # Transparent margin (source pixels) kept around the trimmed sticker; None disables trimming
+TRIM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sticker_trim")
 
-def make_transparent(img):
-    datas = img.getdata()
-    newData = []
-    for item in datas:
-        # Check if pixel is near white (adjust tolerance as needed)
-        if item[0] > 240 and item[1] > 240 and item[2] > 240:
-            newData.append((255, 255, 255, 0)) # Transparent
-        else:
-            newData.append(item)
-    img.putdata(newData)
-    return img
+def key_mask(arr, key_color=KEY_COLOR, tolerance=KEY_TOLERANCE):
+    """Boolean mask of pixels whose RGB channels are all within tolerance of key_color"""
+    mask = np.ones(arr.shape[:2], dtype=bool)
+    for channel, key in enumerate(key_color):
+        lo = max(key - tolerance, 0)
+        hi = min(key + tolerance, 255)
+        band = arr[..., channel]
+        mask &= (band >= lo) & (band <= hi)
+    return mask
+
+def mask_runs(mask, row_offset=0):
+    """Horizontal runs of mask as (row, start, exclusive end) arrays, rows shifted by row_offset"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_row, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1) # Row-major order keeps starts and ends paired
+    return run_row + row_offset, run_start, run_end
+
+def connected_runs(run_row, run_start, run_end, size):
+    """Which runs are 4-connected to the border of an image of size, found by a flood fill over runs
+
+    The runs overlapping each run in the rows above and below are found with searchsorted, and
+    the fill walks runs rather than pixels, so the cost is linear in runs.
+    """
+    width, height = size
+    # Runs are sorted by (row, column), so neighbours in an adjacent row form a contiguous range
+    stride = width + 1
+    start_keys = run_row * stride + run_start
+    end_keys = run_row * stride + run_end
+    below_lo = np.searchsorted(end_keys, (run_row + 1) * stride + run_start, side="right")
+    below_hi = np.searchsorted(start_keys, (run_row + 1) * stride + run_end, side="left")
+    above_lo = np.searchsorted(end_keys, (run_row - 1) * stride + run_start, side="right")
+    above_hi = np.searchsorted(start_keys, (run_row - 1) * stride + run_end, side="left")
+    
+    on_border = (run_row == 0) | (run_row == height - 1) | (run_start == 0) | (run_end == width)
+    visited = on_border.copy()
+    stack = np.flatnonzero(on_border).tolist()
+    below_lo, below_hi = below_lo.tolist(), below_hi.tolist()
+    above_lo, above_hi = above_lo.tolist(), above_hi.tolist()
+    while stack:
+        run = stack.pop()
+        for lo, hi in ((below_lo[run], below_hi[run]), (above_lo[run], above_hi[run])):
+            for neighbour in range(lo, hi):
+                if not visited[neighbour]:
+                    visited[neighbour] = True
+                    stack.append(neighbour)
+    return visited
+
+def paint_runs(run_row, run_start, run_end, y0, y1, width):
+    """Mask of rows y0..y1 covered by the given (row-sorted) runs, via a +1/-1 difference image"""
+    lo, hi = np.searchsorted(run_row, [y0, y1], side="left")
+    marks = np.zeros((y1 - y0, width + 1), dtype=np.int8)
+    marks[run_row[lo:hi] - y0, run_start[lo:hi]] = 1
+    marks[run_row[lo:hi] - y0, run_end[lo:hi]] = -1
+    return np.cumsum(marks, axis=1, dtype=np.int8)[:, :width].astype(bool)
+
+def border_connected(mask):
+    """Pixels of mask 4-connected to the image border, found by a scanline flood fill
+
+    The mask is split into horizontal runs with NumPy and the fill walks runs rather than pixels,
+    so the cost is linear in pixels plus runs.
+    """
+    height, width = mask.shape
+    run_row, run_start, run_end = mask_runs(mask)
+    if run_row.size == 0:
+        return np.zeros_like(mask)
+    visited = connected_runs(run_row, run_start, run_end, (width, height))
+    return paint_runs(run_row[visited], run_start[visited], run_end[visited], 0, height, width)
+
+@functools.lru_cache(maxsize=None)
+def matte_tables(key_color, tolerance, softness):
+    """Lookup tables for the soft matte, built once per key
+
+    distance[c][v]: |v - key[c]| for each channel
+    ramp[d]: matte alpha for a pixel at Chebyshev distance d from the key
+    multiply[a][b]: a * b / 255, to combine the matte with the source alpha
+    unmix[c][a][v]: channel value with the key colour removed at matte alpha a
+    """
+    values = np.arange(256, dtype=np.float64)
+    distance = [np.abs(values - key).astype(np.uint8) for key in key_color]
+    
+    ramp = np.clip((values - tolerance) / (softness + 1), 0.0, 1.0)
+    ramp = np.round(ramp * 255).astype(np.uint8)
+    
+    multiply = np.round(np.outer(values, values) / 255).astype(np.uint8)
+    
+    alpha = values[:, np.newaxis] / 255
+    unmix = []
+    for key in key_color:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Observed = a * F + (1 - a) * key  =>  F = (observed - (1 - a) * key) / a
+            table = (values[np.newaxis, :] - (1 - alpha) * key) / alpha
+        table[0, :] = key # Fully keyed pixels keep the key colour, as the hard key does
+        unmix.append(np.clip(np.round(table), 0, 255).astype(np.uint8))
+    return distance, ramp, multiply, unmix
+
+def key_array(arr, key_color=KEY_COLOR, tolerance=KEY_TOLERANCE, softness=KEY_SOFTNESS, region=None):
+    """Key an RGBA array in place; region (optional) limits keying to those pixels
+
+    With softness 0 this is the hard key. Otherwise alpha ramps from 0 at `tolerance` to fully
+    opaque at `tolerance + softness + 1`, and edge pixels have the key colour unmixed from them.
+    """
+    key_color = tuple(key_color)
+    if softness == 0:
+        mask = key_mask(arr, key_color, tolerance)
+        if region is not None:
+            mask &= region
+        arr[mask] = (*key_color, 0) # Transparent
+        return arr
+    
+    distance, ramp, multiply, unmix = matte_tables(key_color, tolerance, softness)
+    d = distance[0][arr[..., 0]]
+    np.maximum(d, distance[1][arr[..., 1]], out=d)
+    np.maximum(d, distance[2][arr[..., 2]], out=d)
+    matte = ramp[d]
+    if region is not None:
+        matte[~region] = 255
+    
+    # Only pixels inside the key band change; everything else is left untouched
+    band = matte < 255
+    pixels = arr[band]
+    band_matte = matte[band]
+    for channel in range(3):
+        pixels[:, channel] = unmix[channel][band_matte, pixels[:, channel]]
+    pixels[:, 3] = multiply[pixels[:, 3], band_matte]
+    arr[band] = pixels
+    return arr
 
-def import_sticker(name):
+def make_transparent(img, key_color=KEY_COLOR, tolerance=KEY_TOLERANCE, key_mode=KEY_MODE, softness=KEY_SOFTNESS):
+    """Key out pixels near key_color (all of them, or only those reachable from the border)"""
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    arr = np.array(img)
+    region = None
+    if key_mode == "border":
+        region = border_connected(key_mask(arr, key_color, tolerance + softness))
+    arr = key_array(arr, key_color, tolerance, softness, region)
+    return Image.fromarray(arr, "RGBA")
+
+def trim_box(bbox, size, padding=TRIM_PADDING):
+    """Square crop box centred on the alpha bbox plus padding; may extend past the image, which crops to transparent
+
+    ImageProcessor draws asset stickers into a square rect, so the trimmed sticker has to stay square
+    or exports would stretch it while the preview (scaledToFit) does not.
+    """
+    if padding is None or bbox is None:
+        return (0, 0) + size # Nothing to trim (or trimming disabled): keep the full image
+    left, top, right, bottom = bbox
+    side = max(right - left, bottom - top) + 2 * padding
+    left -= (side - (right - left)) // 2
+    top -= (side - (bottom - top)) // 2
+    return left, top, left + side, top + side
+
+def write_trim_sidecar(name, source_size, box, padding):
+    """Record where the shipped sticker sits in the source artwork, in source (@3x) pixels"""
+    os.makedirs(TRIM_PATH, exist_ok=True)
+    sidecar = {
+        "source_size": list(source_size),
+        "crop": list(box),
+        "padding": padding,
+        "source_scale": asset_catalog.SOURCE_SCALE
+    }
+    with open(os.path.join(TRIM_PATH, f"{name}.json"), "w") as f:
+        json.dump(sidecar, f, indent=4)
+
+def find_artifact(name):
+    return artifact_index.find_artifact(ARTIFACTS_PATH, name)
+
+def sticker_params(key_color=KEY_COLOR, tolerance=KEY_TOLERANCE, key_mode=KEY_MODE, softness=KEY_SOFTNESS,
+                   trim_padding=TRIM_PADDING):
+    """Processing parameters recorded in the manifest; changing any of them rebuilds the sticker"""
+    return {
+        "pipeline": "process_stickers",
+        "key_color": list(key_color),
+        "tolerance": tolerance,
+        "key_mode": key_mode,
+        "softness": softness,
+        "trim_padding": trim_padding,
+        "scales": list(asset_catalog.SCALES),
+        "source_scale": asset_catalog.SOURCE_SCALE
+    }
+
+def plan_sticker(name, **options):
+    params = sticker_params(**options)
+    return find_artifact(name), params, os.path.join(ASSETS_PATH, f"{name}.imageset")
+
+def import_sticker(name, key_color=KEY_COLOR, tolerance=KEY_TOLERANCE, key_mode=KEY_MODE, softness=KEY_SOFTNESS,
+                   trim_padding=TRIM_PADDING, max_memory=strip_processing.MAX_MEMORY):
     print(f"Processing {name}...")
     
     # 1. Find the artifact file
-    pattern = os.path.join(ARTIFACTS_PATH, f"{name}*.png")
-    matches = glob.glob(pattern)
+    source_file = find_artifact(name)
     
-    if not matches:
+    if not source_file:
         print(f"Error: Could not find generated image for {name}")
-        return
-        
-    source_file = matches[0] # Take the first match
+        return False
     
     # 2. Open and Process Image
     try:
         img = Image.open(source_file)
-        img = img.convert("RGBA")
-        img = make_transparent(img)
+        tiled = strip_processing.needs_strips(img.size, max_memory)
+        if tiled:
+            # Very large artwork: keep the decoded source in its own mode and convert, key, resample
+            # and encode it a strip at a time, first for the bbox and then for every rendition
+            rows = strip_processing.strip_height(img.width, max_memory)
+            reached = None
+            if key_mode == "border":
+                # Only the key mask's runs are kept between strips; each strip's region is painted from them
+                runs = [mask_runs(key_mask(strip, key_color, tolerance + softness), y0)
+                        for y0, strip in zip(range(0, img.height, rows), strip_processing.crop_in_strips(img, rows))]
+                run_row, run_start, run_end = (np.concatenate(parts) for parts in zip(*runs))
+                visited = connected_runs(run_row, run_start, run_end, img.size)
+                reached = run_row[visited], run_start[visited], run_end[visited]
+            
+            def key_func(arr, x0, y0):
+                strip_region = None
+                if reached is not None:
+                    strip_region = paint_runs(*reached, y0, y0 + arr.shape[0], img.width)[:, x0:x0 + arr.shape[1]]
+                return key_array(arr, key_color, tolerance, softness, strip_region)
+            bbox = strip_processing.bbox_in_strips(img, key_func, rows)
+        else:
+            img = img.convert("RGBA")
+            img = make_transparent(img, key_color, tolerance, key_mode, softness)
+            bbox = img.getchannel("A").getbbox() if trim_padding is not None else None
+        
+        # 3. Trim to the alpha bounding box (what ImageProcessor.trimTransparency does on device)
+        source_size = img.size
+        box = trim_box(bbox, source_size, trim_padding)
+        if not tiled and box != (0, 0) + source_size:
+            img = img.crop(box)
         
-        # 3. Create Destination Directory
+        # 4. Create Destination Directory
         dest_dir = os.path.join(ASSETS_PATH, f"{name}.imageset")
         if os.path.exists(dest_dir):
             shutil.rmtree(dest_dir)
         os.makedirs(dest_dir)
         
-        # 4. Save Processed Image
-        dest_file = os.path.join(dest_dir, f"{name}.png")
-        img.save(dest_file, "PNG")
-        
-        # 5. Create Contents.json
-        contents = {
-            "images": [
-                {
-                    "filename": f"{name}.png",
-                    "idiom": "universal",
-                    "scale": "1x"
-                },
-                 {
-                    "idiom": "universal",
-                    "scale": "2x"
-                },
-                 {
-                    "idiom": "universal",
-                    "scale": "3x"
-                }
-            ],
-            "info": {
-                "author": "xcode",
-                "version": 1
-            }
-        }
+        # 5. Save 1x/2x/3x Renditions (all resampled from the single decoded image)
+        if tiled:
+            filenames = asset_catalog.save_renditions_in_strips(img, dest_dir, name, rows, box, key_func)
+        else:
+            renditions = asset_catalog.render_scales(img)
+            filenames = asset_catalog.save_renditions(renditions, dest_dir, name)
         
-        with open(os.path.join(dest_dir, "Contents.json"), "w") as f:
-            json.dump(contents, f, indent=4)
+        # 6. Create Contents.json
+        asset_catalog.write_contents_json(dest_dir, filenames)
+        if trim_padding is not None:
+            write_trim_sidecar(name, source_size, box, trim_padding)
+        elif os.path.exists(os.path.join(TRIM_PATH, f"{name}.json")):
+            os.remove(os.path.join(TRIM_PATH, f"{name}.json")) # Untrimmed now; drop the stale crop record
             
         print(f"Successfully imported and processed {name}")
+        params = sticker_params(key_color, tolerance, key_mode, softness, trim_padding)
+        return sticker_cache.build_entry(source_file, params, dest_dir)
         
     except Exception as e:
         print(f"Failed to process {name}: {e}")
+        return False
+
+def bind_options(args):
+    options = {
+        "key_mode": args.key_mode,
+        "softness": args.softness,
+        "trim_padding": None if args.no_trim else args.trim_padding
+    }
+    func = functools.partial(import_sticker, max_memory=args.max_memory * 1024 * 1024, **options)
+    return func, functools.partial(plan_sticker, **options)
+
+def build_parser(description="Key generated sticker artwork and import it into Assets.xcassets"):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--max-memory", type=int, default=strip_processing.MAX_MEMORY // (1024 * 1024),
+                        help="Working-memory budget in MB on top of the decoded source; larger images are processed in strips")
+    parser.add_argument("--key-mode", choices=KEY_MODES, default=KEY_MODE,
+                        help="global: key every near-key pixel; border: only background connected to the edge")
+    parser.add_argument("--softness", type=int, default=KEY_SOFTNESS,
+                        help="Soft matte: ramp alpha over this many levels past the tolerance (0 = hard key)")
+    parser.add_argument("--trim-padding", type=int, default=TRIM_PADDING,
+                        help="Transparent margin in source pixels kept around trimmed stickers")
+    parser.add_argument("--no-trim", action="store_true",
+                        help="Keep the full artwork instead of trimming to the alpha bounding box")
+    return parser
 
 # Main execution
 if __name__ == "__main__":
-    if not os.path.exists(ASSETS_PATH):
-        print(f"Error: Assets path not found at {ASSETS_PATH}")
-    else:
-        for name in STICKER_NAMES:
-            import_sticker(name)
-        print("Done.")
+    sticker_batch.main(import_sticker, STICKER_NAMES, ASSETS_PATH, plan=plan_sticker,
+                       parser=build_parser(), bind=bind_options)
@@ -0,0 +1,166 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import functools
+import numpy as np
+import sticker_batch
+from PIL import Image
+from generate_filter_previews import noir
+
+# Configuration
+GRAIN_SEED = 1234 # Fixed so reference outputs are reproducible
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg")
+
+# ImageProcessor.applyEffect parameters, per EffectType
+EFFECT_PARAMS = {
+    "vignette": {"intensity": 1.0, "radius": 2.0},
+    "bloom": {"intensity": 0.8, "radius": 10.0},
+    "noir": {},
+    "crystal": {"intensity": 1.0, "radius": 10.0},
+    "blur": {"radius": 10.0},
+    "edges": {"intensity": 1.0},
+    "posterize": {"levels": 6},
+    "grain": {}
+}
+
+@functools.lru_cache(maxsize=None)
+def gaussian_kernel(sigma):
+    radius = max(1, int(np.ceil(3 * sigma)))
+    x = np.arange(-radius, radius + 1, dtype=np.float32)
+    kernel = np.exp(-(x * x) / (2 * sigma * sigma))
+    return kernel / kernel.sum()
+
+def _convolve_axis(arr, kernel, axis):
+    radius = len(kernel) // 2
+    pad = [(0, 0)] * arr.ndim
+    pad[axis] = (radius, radius)
+    padded = np.pad(arr, pad, mode="edge") # Clamp to extent, like CIImage.clampedToExtent
+    padded = np.moveaxis(padded, axis, 0)
+    length = arr.shape[axis]
+    out = padded[:length] * kernel[0]
+    for offset in range(1, len(kernel)):
+        out += padded[offset:offset + length] * kernel[offset]
+    return np.moveaxis(out, 0, axis)
+
+_blur_cache = {"source": None, "results": {}}
+
+def gaussian_blur(rgb, sigma):
+    """Separable Gaussian blur of an (H, W, C) float image: one 1D pass per axis
+
+    Bloom, crystal and blur all blur the same decoded image with the same radius, so the
+    result for the most recent source image is kept and reused.
+    """
+    if _blur_cache["source"] is not rgb:
+        _blur_cache["source"] = rgb
+        _blur_cache["results"] = {}
+    results = _blur_cache["results"]
+    if sigma not in results:
+        kernel = gaussian_kernel(float(sigma))
+        results[sigma] = _convolve_axis(_convolve_axis(rgb, kernel, 0), kernel, 1)
+    return results[sigma]
+
+@functools.lru_cache(maxsize=32)
+def vignette_mask(height, width, intensity, radius):
+    """Radial darkening mask for one image size, computed once and reused for the whole batch"""
+    y = (np.arange(height, dtype=np.float32) - (height - 1) / 2) / (height / 2)
+    x = (np.arange(width, dtype=np.float32) - (width - 1) / 2) / (width / 2)
+    distance = np.sqrt(y[:, np.newaxis] ** 2 + x[np.newaxis, :] ** 2) / np.sqrt(2)
+    falloff = np.clip(distance * radius / 2, 0.0, 1.0)
+    mask = 1.0 - intensity * falloff * falloff * (3 - 2 * falloff) # Smoothstep
+    mask.setflags(write=False)
+    return mask[..., np.newaxis]
+
+def vignette(rgb, intensity, radius):
+    return rgb * vignette_mask(rgb.shape[0], rgb.shape[1], intensity, radius)
+
+def bloom(rgb, intensity, radius):
+    """CIBloom: screen a blurred copy over the image"""
+    glow = gaussian_blur(rgb, radius) * intensity
+    return 1.0 - (1.0 - rgb) * (1.0 - glow)
+
+def crystal(rgb, intensity, radius):
+    """CIGloom (shown as "Kristall"): multiply by a blurred copy to dull the highlights"""
+    return rgb * (1.0 - intensity + intensity * gaussian_blur(rgb, radius))
+
+def blur(rgb, radius):
+    return gaussian_blur(rgb, radius)
+
+def edges(rgb, intensity):
+    """CIEdges: per-channel Sobel gradient magnitude"""
+    padded = np.pad(rgb, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    gx = (padded[:-2, 2:] + 2 * padded[1:-1, 2:] + padded[2:, 2:]
+          - padded[:-2, :-2] - 2 * padded[1:-1, :-2] - padded[2:, :-2])
+    gy = (padded[2:, :-2] + 2 * padded[2:, 1:-1] + padded[2:, 2:]
+          - padded[:-2, :-2] - 2 * padded[:-2, 1:-1] - padded[:-2, 2:])
+    return np.sqrt(gx * gx + gy * gy) * intensity
+
+def posterize(rgb, levels):
+    return np.round(rgb * (levels - 1)) / (levels - 1)
+
+def grain(rgb, seed=GRAIN_SEED):
+    """Seeded grey noise overlay-blended onto the image, as the grain effect does with CIRandomGenerator"""
+    rng = np.random.default_rng(seed)
+    noise = rng.random(rgb.shape[:2], dtype=np.float32)[..., np.newaxis]
+    return np.where(rgb < 0.5, 2 * rgb * noise, 1 - 2 * (1 - rgb) * (1 - noise))
+
+EFFECTS = {
+    "vignette": vignette,
+    "bloom": bloom,
+    "noir": noir,
+    "crystal": crystal,
+    "blur": blur,
+    "edges": edges,
+    "posterize": posterize,
+    "grain": grain
+}
+
+def apply_effect(effect, rgb):
+    """Apply one effect to an (H, W, 3) float image in [0, 1]"""
+    return np.clip(EFFECTS[effect](rgb, **EFFECT_PARAMS[effect]), 0.0, 1.0)
+
+def render_image(path, output_path, effects):
+    """Decode one image once and write it through every requested effect"""
+    img = Image.open(path)
+    alpha = img.getchannel("A") if "A" in img.getbands() else None
+    rgb = np.asarray(img.convert("RGB"), dtype=np.float32) / 255.0
+    stem = os.path.splitext(os.path.basename(path))[0]
+    
+    for effect in effects:
+        out = Image.fromarray(np.round(apply_effect(effect, rgb) * 255).astype(np.uint8), "RGB")
+        if alpha is not None:
+            out.putalpha(alpha)
+        effect_dir = os.path.join(output_path, effect)
+        os.makedirs(effect_dir, exist_ok=True)
+        out.save(os.path.join(effect_dir, f"{stem}.png"), "PNG", compress_level=1) # Reference output, favour speed
+    return True
+
+def find_images(input_path):
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(input_path, pattern)))
+    return sorted(paths)
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render reference outputs for every EffectType over a folder of images")
+    parser.add_argument("input", help="Folder of test images")
+    parser.add_argument("output", help="Folder to write <effect>/<image>.png into")
+    parser.add_argument("-j", "--jobs", type=int, default=sticker_batch.default_jobs(),
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--effects", nargs="+", choices=list(EFFECTS), default=list(EFFECTS),
+                        help="Effects to render (default: all)")
+    args = parser.parse_args()
+    
+    images = find_images(args.input)
+    if not images:
+        print(f"Error: No images found in {args.input}")
+        sys.exit(1)
+    
+    func = functools.partial(render_image, output_path=args.output, effects=args.effects)
+    start = time.perf_counter()
+    results = sticker_batch.run_batch(func, images, args.jobs)
+    if not sticker_batch.print_summary(results, 0, time.perf_counter() - start, "images"):
+        sys.exit(1)
+    print("Done.")
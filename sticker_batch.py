@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import sticker_cache
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+def add_batch_arguments(parser, cached=True):
+    """Add the shared batch options (--jobs, --force and an optional list of names) to a parser"""
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="Number of worker processes (default: CPU count)")
+    if cached:
+        parser.add_argument("-f", "--force", action="store_true",
+                            help="Rebuild every sticker, ignoring the manifest")
+    parser.add_argument("names", nargs="*",
+                        help="Sticker names to process (default: all of STICKER_NAMES)")
+    return parser
+
+def _run_one(func, name):
+    try:
+        result = func(name)
+        if result is False:
+            return name, False, "see log above", None
+        return name, True, None, result
+    except Exception as e:
+        return name, False, str(e), None
+
+def run_batch(func, names, jobs=None):
+    """Run func(name) for every name on a process pool and return {name: (ok, error, result)}"""
+    jobs = max(1, jobs or default_jobs())
+    results = {}
+    
+    if jobs == 1 or len(names) <= 1:
+        for name in names:
+            name, ok, error, result = _run_one(func, name)
+            results[name] = (ok, error, result)
+        return results
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, len(names))) as pool:
+        futures = {pool.submit(_run_one, func, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                name, ok, error, result = future.result()
+            except Exception as e: # Worker died (e.g. killed or out of memory)
+                ok, error, result = False, str(e), None
+            results[name] = (ok, error, result)
+    return results
+
+def stale_names(names, manifest, plan):
+    """Names whose manifest entry no longer matches their source, params or outputs"""
+    stale = []
+    for name in names:
+        source_file, params, dest_dir = plan(name)
+        entry = manifest["stickers"].get(name)
+        if source_file is None or not sticker_cache.is_fresh(entry, source_file, params, dest_dir):
+            stale.append(name)
+    return stale
+
+def update_manifest(manifest, results):
+    """Record the entries of rebuilt stickers, forget failed ones and save if anything ran"""
+    for name, (ok, _, entry) in results.items():
+        if ok and isinstance(entry, dict):
+            manifest["stickers"][name] = entry
+        else:
+            manifest["stickers"].pop(name, None)
+    if results:
+        sticker_cache.save_manifest(manifest)
+
+def print_summary(results, skipped, elapsed, noun="stickers"):
+    failed = {name: error for name, (ok, error, _) in results.items() if not ok}
+    print(f"\nProcessed {len(results)} {noun} in {elapsed:.2f}s")
+    print(f"   Succeeded: {len(results) - len(failed)}")
+    print(f"   Up to date: {skipped}")
+    print(f"   Failed: {len(failed)}")
+    for name in sorted(failed):
+        print(f"   - {name}: {failed[name]}")
+    return not failed
+
+def main(func, sticker_names, assets_path, plan=None, description=None, argv=None, parser=None, bind=None):
+    """Parse options, rebuild stale stickers and exit non-zero if any sticker failed
+
+    plan(name) returns (source_file, params, dest_dir) for the manifest check; func(name)
+    returns the manifest entry for a rebuilt sticker. Without plan every sticker is rebuilt.
+    Scripts with extra options pass their own parser and bind(args), which returns the
+    picklable (func, plan) pair to use for those options.
+    """
+    parser = add_batch_arguments(parser or argparse.ArgumentParser(description=description))
+    args = parser.parse_args(argv)
+    if bind:
+        func, plan = bind(args)
+    
+    if not os.path.exists(assets_path):
+        print(f"Error: Assets path not found at {assets_path}")
+        sys.exit(1)
+    
+    names = args.names or sticker_names
+    start = time.perf_counter()
+    
+    manifest = sticker_cache.load_manifest() if plan else None
+    if manifest is not None and not args.force:
+        todo = stale_names(names, manifest, plan)
+    else:
+        todo = list(names)
+    
+    results = run_batch(func, todo, args.jobs)
+    
+    if manifest is not None:
+        update_manifest(manifest, results)
+    
+    if not print_summary(results, len(names) - len(todo), time.perf_counter() - start):
+        sys.exit(1)
+    print("Done.")
@@ -0,0 +1,54 @@
+import os
+import json_cache
+from json_cache import file_hash
+
+# Configuration
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sticker_manifest.json")
+MANIFEST_VERSION = 1
+
+def source_fingerprint(path, previous=None):
+    """Describe a source file; reuse the previous hash when size and mtime are unchanged"""
+    stat = os.stat(path)
+    fingerprint = {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+    if previous and all(previous.get(k) == fingerprint[k] for k in ("path", "size", "mtime_ns")):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = file_hash(path)
+    return fingerprint
+
+def output_hashes(dest_dir):
+    """Map of file name to hash for everything in an .imageset folder"""
+    if not os.path.isdir(dest_dir):
+        return {}
+    return {
+        filename: file_hash(os.path.join(dest_dir, filename))
+        for filename in sorted(os.listdir(dest_dir))
+        if os.path.isfile(os.path.join(dest_dir, filename))
+    }
+
+def build_entry(source_file, params, dest_dir):
+    """Manifest entry recorded after a sticker has been (re)built"""
+    return {
+        "source": source_fingerprint(source_file),
+        "params": params,
+        "outputs": output_hashes(dest_dir)
+    }
+
+def is_fresh(entry, source_file, params, dest_dir):
+    """True if the sticker was built from this exact source with these params and is untouched"""
+    if not entry or entry.get("params") != params:
+        return False
+    previous = entry.get("source")
+    if source_fingerprint(source_file, previous)["sha256"] != previous.get("sha256"):
+        return False
+    return output_hashes(dest_dir) == entry.get("outputs")
+
+def load_manifest(path=None):
+    return json_cache.load_cache(path or MANIFEST_PATH, MANIFEST_VERSION, "stickers")
+
+def save_manifest(manifest, path=None):
+    json_cache.save_cache(manifest, path or MANIFEST_PATH)
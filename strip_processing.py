@@ -0,0 +1,192 @@
+import math
+import zlib
+import struct
+import numpy as np
+from PIL import Image
+
+# Configuration
+MAX_MEMORY = 512 * 1024 * 1024 # Working-set budget (bytes) on top of the decoded source before switching to strips
+STRIP_BYTES_PER_PIXEL = 48 # Rough peak per strip pixel: source crop, RGBA copy, key temporaries and premultiplied resize
+FILTER_BLOCK_BYTES = 256 * 1024 # Scanline bytes PNG-filtered at once; peak temporaries are about 60x this
+LANCZOS_SUPPORT = 3.0
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def needs_strips(size, max_memory=MAX_MEMORY, copies=3):
+    """True if whole-image processing (about `copies` RGBA buffers) would exceed max_memory"""
+    width, height = size
+    return max_memory is not None and width * height * 4 * copies > max_memory
+
+def strip_height(width, max_memory=MAX_MEMORY):
+    """Rows per strip so that one strip's working set stays under max_memory"""
+    return max(1, max_memory // (width * STRIP_BYTES_PER_PIXEL))
+
+def iter_strips(height, rows):
+    for y0 in range(0, height, rows):
+        yield y0, min(y0 + rows, height)
+
+def alpha_bbox(arr, y_offset=0):
+    """(left, top, right, bottom) of pixels with alpha > 0, or None if there are none"""
+    alpha = arr[..., 3] > 0
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return int(cols[0]), int(rows[0]) + y_offset, int(cols[-1]) + 1, int(rows[-1]) + 1 + y_offset
+
+def union_bbox(a, b):
+    if a is None or b is None:
+        return a or b
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+def keyed_region(img, box, key_func=None):
+    """RGBA array of img's box region, keyed by key_func(arr, x0, y0); outside the image is transparent
+
+    img stays in its decoded mode, only the region is converted, so no full-size RGBA copy is made.
+    """
+    left, top, right, bottom = box
+    width, height = img.size
+    clipped = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+    out = np.zeros((bottom - top, right - left, 4), dtype=np.uint8)
+    if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+        return out
+    region = img.crop(clipped)
+    arr = np.array(region if region.mode == "RGBA" else region.convert("RGBA"))
+    if key_func is not None:
+        arr = key_func(arr, clipped[0], clipped[1])
+    if clipped == tuple(box):
+        return arr
+    out[clipped[1] - top:clipped[3] - top, clipped[0] - left:clipped[2] - left] = arr
+    return out
+
+def bbox_in_strips(img, key_func, rows):
+    """Alpha bounding box of the keyed image, gathered strip by strip without keeping any strip"""
+    width, height = img.size
+    bbox = None
+    for y0, y1 in iter_strips(height, rows):
+        bbox = union_bbox(bbox, alpha_bbox(keyed_region(img, (0, y0, width, y1), key_func), y0))
+    return bbox
+
+def resize_in_strips(img, size, rows, box=None, key_func=None):
+    """Yield a Lanczos resize of img (or its box region) to size as strips of at most `rows` output rows
+
+    Each strip is resampled from a source region padded by the filter support, so the joined
+    strips match a whole-image resize (to within a rounding step) while only one region is
+    converted, keyed and premultiplied at a time.
+    """
+    left, top, right, bottom = box or (0, 0) + img.size
+    src_width, src_height = right - left, bottom - top
+    out_width, out_height = size
+    scale = src_height / out_height
+    support = LANCZOS_SUPPORT * max(scale, 1.0) + 1
+    
+    for oy0, oy1 in iter_strips(out_height, rows):
+        by0, by1 = oy0 * scale, oy1 * scale
+        cy0 = max(0, math.floor(by0 - support))
+        cy1 = min(src_height, math.ceil(by1 + support))
+        region = Image.fromarray(keyed_region(img, (left, top + cy0, right, top + cy1), key_func), "RGBA")
+        yield region.resize((out_width, oy1 - oy0), Image.LANCZOS,
+                            box=(0, by0 - cy0, src_width, by1 - cy0))
+
+def crop_in_strips(img, rows, box=None, key_func=None):
+    """Yield img (or its box region; outside the image is transparent) as RGBA strip arrays of `rows` rows"""
+    left, top, right, bottom = box or (0, 0) + img.size
+    for y0, y1 in iter_strips(bottom - top, rows):
+        yield keyed_region(img, (left, top + y0, right, top + y1), key_func)
+
+def _filter_block(raw, prev):
+    raw = raw.astype(np.int16)
+    up = np.vstack([prev[np.newaxis].astype(np.int16), raw[:-1]])
+    left = np.zeros_like(raw)
+    left[:, 4:] = raw[:, :-4]
+    up_left = np.zeros_like(up)
+    up_left[:, 4:] = up[:, :-4]
+    
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+    
+    candidates = np.stack([
+        raw,
+        raw - left,
+        raw - up,
+        raw - ((left + up) >> 1),
+        raw - paeth
+    ]).astype(np.uint8) # Wraps modulo 256 as PNG requires
+    del p, pa, pb, pc, paeth, left, up, up_left
+    
+    cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    best = cost.argmin(axis=0)
+    rows = np.arange(raw.shape[0])
+    out = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+    out[:, 0] = best
+    out[:, 1:] = candidates[best, rows]
+    return out
+
+def filter_rows(raw, prev):
+    """PNG-filter a block of RGBA scanlines, picking the best filter per row (minimum sum of abs)
+
+    Rows are filtered FILTER_BLOCK_BYTES at a time: the five candidate filters need about 60 bytes
+    of temporaries per input byte, which must not scale with the strip height.
+    """
+    block = max(1, FILTER_BLOCK_BYTES // raw.shape[1])
+    if raw.shape[0] <= block:
+        return _filter_block(raw, prev)
+    out = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+    for y0 in range(0, raw.shape[0], block):
+        out[y0:y0 + block] = _filter_block(raw[y0:y0 + block], prev)
+        prev = raw[min(y0 + block, raw.shape[0]) - 1]
+    return out
+
+class PngStripWriter:
+    """Streams an RGBA PNG to disk strip by strip instead of encoding a whole in-memory image"""
+    
+    def __init__(self, path, size, compress_level=6):
+        self.width, self.height = size
+        self.file = open(path, "wb")
+        self.compressor = zlib.compressobj(compress_level)
+        self.prev = np.zeros(self.width * 4, dtype=np.uint8)
+        self.rows_written = 0
+        self.file.write(PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0))
+    
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+    
+    def write(self, strip):
+        """Append an RGBA strip (PIL image or HxWx4 array) below the rows written so far"""
+        raw = np.asarray(strip, dtype=np.uint8).reshape(-1, self.width * 4)
+        data = self.compressor.compress(filter_rows(raw, self.prev).tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.prev = raw[-1].copy()
+        self.rows_written += raw.shape[0]
+    
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Wrote {self.rows_written} rows, expected {self.height}")
+            self._chunk(b"IDAT", self.compressor.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+def save_strips(path, size, strips):
+    """Encode an iterable of RGBA strips into one PNG file"""
+    with PngStripWriter(path, size) as writer:
+        for strip in strips:
+            writer.write(strip)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Translation coverage report for Localizable.xcstrings
+Builds the key x language matrix once per file version and answers queries from it
+"""
+
+import os
+import sys
+import time
+import argparse
+import json_cache
+import xcstrings_catalog
+from translation_table import TranslationTable
+
+COVERAGE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".translation_coverage_cache.json")
+COVERAGE_CACHE_VERSION = 1 # Bump when build_matrix changes
+
+# One character per key x language cell
+CELL_CODES = {"translated": "t", "needs_review": "r", "new": "n", "stale": "s"}
+MISSING = "-"
+RICH = "v" # Plural/device variations or substitutions; counted as translated
+OTHER = "?"
+DONE = {CELL_CODES["translated"], RICH}
+
+def build_matrix(table):
+    """Compact, JSON-friendly coverage matrix: one string of cell codes per language"""
+    columns = {}
+    for column, lang_code in enumerate(table.languages):
+        cells = []
+        for row, state in enumerate(table.states[column]):
+            if (row, column) in table.raw:
+                cells.append(RICH)
+            elif state is None:
+                cells.append(MISSING)
+            else:
+                cells.append(CELL_CODES.get(state, OTHER))
+        columns[lang_code] = "".join(cells)
+    return {
+        "source_language": table.source_language,
+        "keys": table.keys,
+        "extraction": [metadata.get("extractionState", "") for metadata in table.metadata],
+        "translatable": [metadata.get("shouldTranslate", True) for metadata in table.metadata],
+        "columns": columns
+    }
+
+def load_matrix(filepath, cache_path=None):
+    """Matrix for filepath, rebuilt only when the file's hash changed; returns (matrix, cached)"""
+    cache_path = cache_path or COVERAGE_CACHE_PATH
+    digest = json_cache.file_hash(filepath)
+    cache = json_cache.load_cache(cache_path, COVERAGE_CACHE_VERSION, "coverage")
+    entry = cache["coverage"]
+    if entry.get("sha256") == digest:
+        return entry["matrix"], True
+    
+    matrix = build_matrix(TranslationTable.from_xcstrings(xcstrings_catalog.load_xcstrings(filepath)))
+    cache["coverage"] = {"path": os.path.abspath(filepath), "sha256": digest, "matrix": matrix}
+    json_cache.save_cache(cache, cache_path)
+    return matrix, False
+
+def target_languages(matrix):
+    """Languages that are expected to be complete (everything but the source language)"""
+    return sorted(lang for lang in matrix["columns"] if lang != matrix["source_language"])
+
+def required_rows(matrix):
+    return [row for row, translatable in enumerate(matrix["translatable"]) if translatable]
+
+def missing(matrix, lang_code):
+    """Keys with no localization in lang_code"""
+    column = matrix["columns"].get(lang_code)
+    rows = required_rows(matrix)
+    if column is None:
+        return [matrix["keys"][row] for row in rows]
+    return [matrix["keys"][row] for row in rows if column[row] == MISSING]
+
+def not_done(matrix, lang_code):
+    """Keys localized in lang_code whose state isn't "translated" (needs_review, new, stale...)"""
+    column = matrix["columns"].get(lang_code, "")
+    return [(matrix["keys"][row], code) for row, code in enumerate(column) if code not in DONE and code != MISSING]
+
+def untranslated(matrix):
+    """Translatable keys with no localization in any language"""
+    columns = list(matrix["columns"].values())
+    return [
+        matrix["keys"][row] for row in required_rows(matrix)
+        if all(column[row] == MISSING for column in columns)
+    ]
+
+def stale_keys(matrix):
+    """Keys Xcode no longer finds in the sources"""
+    return [key for key, state in zip(matrix["keys"], matrix["extraction"]) if state == "stale"]
+
+def summary(matrix):
+    """Per language: (done, total required, missing, not done)"""
+    rows = required_rows(matrix)
+    report = {}
+    for lang_code in target_languages(matrix):
+        column = matrix["columns"][lang_code]
+        cells = [column[row] for row in rows]
+        done = sum(cell in DONE for cell in cells)
+        gaps = cells.count(MISSING)
+        report[lang_code] = (done, len(rows), gaps, len(cells) - done - gaps)
+    return report
+
+def print_summary(matrix, min_coverage):
+    report = summary(matrix)
+    failing = []
+    print(f"{'Language':<10} {'Coverage':>9} {'Missing':>8} {'Review':>7}")
+    for lang_code, (done, total, gaps, pending) in sorted(report.items(), key=lambda item: item[1][0]):
+        coverage = 100.0 * done / total if total else 100.0
+        marker = ""
+        if coverage < min_coverage:
+            failing.append(lang_code)
+            marker = "  ❌"
+        print(f"{lang_code:<10} {coverage:>8.1f}% {gaps:>8} {pending:>7}{marker}")
+    
+    empty = untranslated(matrix)
+    stale = stale_keys(matrix)
+    print(f"\n{len(matrix['keys'])} keys, {len(report)} languages")
+    print(f"   Untranslated keys: {len(empty)}")
+    print(f"   Stale keys: {len(stale)}")
+    if failing:
+        print(f"\n❌ {len(failing)} languages below {min_coverage:g}% coverage: {', '.join(failing)}")
+    return not failing
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Translation coverage of Localizable.xcstrings")
+    parser.add_argument("--file", default=xcstrings_catalog.XCSTRINGS_PATH, help="Path to the .xcstrings file")
+    parser.add_argument("--missing", metavar="LANG", help="List keys with no localization in LANG")
+    parser.add_argument("--review", metavar="LANG", help="List LANG localizations not marked translated")
+    parser.add_argument("--untranslated", action="store_true", help="List keys with no localizations at all")
+    parser.add_argument("--stale", action="store_true", help="List keys Xcode marked stale")
+    parser.add_argument("--min-coverage", type=float, default=0.0,
+                        help="Exit non-zero if any language is below this percentage")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.file):
+        print(f"Error: {args.file} not found")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    matrix, cached = load_matrix(args.file)
+    
+    if args.missing:
+        for key in missing(matrix, args.missing):
+            print(key)
+    elif args.review:
+        for key, code in not_done(matrix, args.review):
+            print(f"{code} {key}")
+    elif args.untranslated:
+        for key in untranslated(matrix):
+            print(key)
+    elif args.stale:
+        for key in stale_keys(matrix):
+            print(key)
+    else:
+        ok = print_summary(matrix, args.min_coverage)
+        print(f"\n({'cached' if cached else 'built'} in {(time.perf_counter() - start) * 1000:.0f} ms)")
+        if not ok:
+            sys.exit(1)
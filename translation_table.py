@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Columnar in-memory model of a Localizable.xcstrings catalog
+One row per key, one column per language, one value slot per key x language
+"""
+
+import sys
+
+TRANSLATED = sys.intern("translated")
+
+class TranslationTable:
+    """Keys x languages table with O(1) cell access and whole-column queries
+    
+    Plain {"stringUnit": {"state", "value"}} localizations live in the value and state
+    columns. Anything richer (plural variations, substitutions, extra fields) is kept
+    verbatim in `raw` so converting back to xcstrings is lossless.
+    """
+    
+    def __init__(self, source_language="de", version="1.1"):
+        self.source_language = source_language
+        self.version = version
+        self.extra = {} # Other top-level catalog fields
+        self.keys = []
+        self.key_index = {}
+        self.languages = []
+        self.language_index = {}
+        self.values = [] # values[column][row] -> str or None
+        self.states = [] # states[column][row] -> interned state or None
+        self.metadata = [] # metadata[row] -> entry fields other than localizations
+        self.has_localizations = [] # has_localizations[row] -> entry had a "localizations" object
+        self.raw = {} # (row, column) -> localization dict that isn't a plain stringUnit
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def __contains__(self, key):
+        return key in self.key_index
+    
+    def add_key(self, key, metadata=None):
+        """Row index for key, appending an empty row if it is new"""
+        row = self.key_index.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.keys.append(key)
+            self.key_index[key] = row
+            self.metadata.append(dict(metadata or {}))
+            self.has_localizations.append(False)
+            for column in range(len(self.languages)):
+                self.values[column].append(None)
+                self.states[column].append(None)
+        return row
+    
+    def add_language(self, lang_code):
+        """Column index for lang_code, appending an empty column if it is new"""
+        column = self.language_index.get(lang_code)
+        if column is None:
+            column = len(self.languages)
+            self.languages.append(sys.intern(lang_code))
+            self.language_index[self.languages[column]] = column
+            self.values.append([None] * len(self.keys))
+            self.states.append([None] * len(self.keys))
+        return column
+    
+    def get(self, key, lang_code):
+        """Translated value for key in lang_code, or None"""
+        row = self.key_index.get(key)
+        column = self.language_index.get(lang_code)
+        if row is None or column is None:
+            return None
+        return self.values[column][row]
+    
+    def state(self, key, lang_code):
+        row = self.key_index.get(key)
+        column = self.language_index.get(lang_code)
+        if row is None or column is None:
+            return None
+        return self.states[column][row]
+    
+    def set(self, key, lang_code, value, state=TRANSLATED):
+        """Store a plain translation; returns True if the cell actually changed"""
+        row = self.add_key(key)
+        column = self.add_language(lang_code)
+        state = sys.intern(state)
+        raw = self.raw.pop((row, column), None)
+        changed = raw is not None or self.values[column][row] != value or self.states[column][row] != state
+        self.values[column][row] = value
+        self.states[column][row] = state
+        self.has_localizations[row] = True
+        return changed
+    
+    def column(self, lang_code):
+        """{key: value} for every key translated into lang_code"""
+        column = self.language_index.get(lang_code)
+        if column is None:
+            return {}
+        return {key: value for key, value in zip(self.keys, self.values[column]) if value is not None}
+    
+    def missing(self, lang_code):
+        """Keys with no localization at all in lang_code"""
+        column = self.language_index.get(lang_code)
+        if column is None:
+            return list(self.keys)
+        return [
+            key for row, (key, value) in enumerate(zip(self.keys, self.values[column]))
+            if value is None and (row, column) not in self.raw
+        ]
+    
+    def with_state(self, lang_code, state):
+        """Keys whose lang_code localization has the given state (e.g. "needs_review")"""
+        column = self.language_index.get(lang_code)
+        if column is None:
+            return []
+        return [key for key, cell in zip(self.keys, self.states[column]) if cell == state]
+    
+    def counts(self):
+        """{lang: number of localized keys} for every language"""
+        return {
+            lang_code: sum(value is not None for value in self.values[column])
+            + sum(1 for (_, raw_column) in self.raw if raw_column == column)
+            for column, lang_code in enumerate(self.languages)
+        }
+    
+    @classmethod
+    def from_xcstrings(cls, data):
+        """Build a table from a parsed .xcstrings dict"""
+        data = dict(data)
+        table = cls(data.pop("sourceLanguage", None), data.pop("version", None))
+        strings = data.pop("strings", {})
+        table.extra = data
+        
+        for key, entry in strings.items():
+            entry = dict(entry)
+            localizations = entry.pop("localizations", None)
+            row = table.add_key(key, entry)
+            if localizations is None:
+                continue
+            table.has_localizations[row] = True
+            for lang_code, localization in localizations.items():
+                column = table.add_language(lang_code)
+                unit = localization.get("stringUnit")
+                if (len(localization) == 1 and isinstance(unit, dict) and set(unit) == {"state", "value"}
+                        and isinstance(unit["value"], str)):
+                    table.values[column][row] = unit["value"]
+                    table.states[column][row] = sys.intern(unit["state"])
+                else:
+                    table.raw[(row, column)] = localization
+        return table
+    
+    def to_xcstrings(self):
+        """The table as a .xcstrings dict, equal to the one it was built from plus any edits"""
+        strings = {}
+        for row, key in enumerate(self.keys):
+            entry = dict(self.metadata[row])
+            if self.has_localizations[row]:
+                localizations = {}
+                for column, lang_code in enumerate(self.languages):
+                    raw = self.raw.get((row, column))
+                    if raw is not None:
+                        localizations[lang_code] = raw
+                    elif self.values[column][row] is not None:
+                        localizations[lang_code] = {
+                            "stringUnit": {
+                                "state": self.states[column][row],
+                                "value": self.values[column][row]
+                            }
+                        }
+                entry["localizations"] = localizations
+            strings[key] = entry
+        
+        data = dict(self.extra)
+        if self.source_language is not None:
+            data["sourceLanguage"] = self.source_language
+        data["strings"] = strings
+        if self.version is not None:
+            data["version"] = self.version
+        return data
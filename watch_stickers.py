@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import sticker_batch
+import sticker_cache
+import artifact_index
+import process_stickers
+from process_stickers import ASSETS_PATH, ARTIFACTS_PATH, STICKER_NAMES
+
+# Configuration
+DEBOUNCE = 0.3 # Seconds without new events before a burst of writes is processed
+POLL_INTERVAL = 0.25 # Seconds between directory scans when inotify is not available
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len; followed by len bytes of name
+
+class InotifyWatcher:
+    """Kernel change notifications for one directory (Linux only)"""
+    
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {path}")
+    
+    def changes(self, timeout):
+        """File names changed since the last call, waiting up to timeout seconds for the first one"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names, offset = set(), 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+    
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback that compares (size, mtime) snapshots of a directory"""
+    
+    def __init__(self, path, interval=POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.snapshot = self.scan()
+    
+    def scan(self):
+        snapshot = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+    
+    def changes(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        snapshot = self.scan()
+        names = {name for name, stat in snapshot.items() if self.snapshot.get(name) != stat}
+        self.snapshot = snapshot
+        return names
+    
+    def close(self):
+        pass
+
+def open_watcher(path, polling=False):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling instead")
+    return PollingWatcher(path)
+
+def sticker_names(filenames, names):
+    """Sticker names among the changed files, limited to the ones being watched"""
+    changed = set()
+    for filename in filenames:
+        match = artifact_index.ARTIFACT_PATTERN.match(filename)
+        if match and match.group("name") in names:
+            changed.add(match.group("name"))
+    return changed
+
+def rebuild(func, plan, names, jobs):
+    """Push stale stickers through the pipeline and record them in the manifest"""
+    # The index is cached per process; rescan so new artifacts are seen here and by forked workers
+    artifact_index.artifact_index(ARTIFACTS_PATH, refresh=True)
+    manifest = sticker_cache.load_manifest()
+    # Stickers whose artwork hasn't been generated yet are waited for, not reported as failures
+    present = [name for name in sorted(names) if plan(name)[0] is not None]
+    todo = sticker_batch.stale_names(present, manifest, plan)
+    if not todo:
+        return
+    start = time.perf_counter()
+    results = sticker_batch.run_batch(func, todo, jobs)
+    sticker_batch.update_manifest(manifest, results)
+    sticker_batch.print_summary(results, len(present) - len(todo), time.perf_counter() - start)
+
+def watch(func, plan, names, jobs, debounce=DEBOUNCE, polling=False):
+    """Catch up once, then rebuild stickers whenever their artwork is written"""
+    rebuild(func, plan, names, jobs)
+    watcher = open_watcher(ARTIFACTS_PATH, polling)
+    print(f"Watching {ARTIFACTS_PATH} ({type(watcher).__name__}), press Ctrl+C to stop")
+    pending, last_event = set(), 0.0
+    try:
+        while True:
+            timeout = max(0.0, last_event + debounce - time.monotonic()) if pending else POLL_INTERVAL
+            changed = sticker_names(watcher.changes(timeout), names)
+            if changed:
+                pending |= changed
+                last_event = time.monotonic()
+            elif pending and time.monotonic() - last_event >= debounce:
+                rebuild(func, plan, pending, jobs)
+                pending = set()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+
+# Main execution
+if __name__ == "__main__":
+    parser = process_stickers.build_parser("Watch for new sticker artwork and import it as soon as it is saved")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                        help="Seconds of quiet after a write before the sticker is rebuilt")
+    parser.add_argument("--poll", action="store_true", help="Poll the folder instead of using inotify")
+    sticker_batch.add_batch_arguments(parser, cached=False)
+    args = parser.parse_args()
+    
+    for path in (ASSETS_PATH, ARTIFACTS_PATH):
+        if not os.path.exists(path):
+            print(f"Error: Path not found at {path}")
+            sys.exit(1)
+    
+    func, plan = process_stickers.bind_options(args)
+    watch(func, plan, set(args.names or STICKER_NAMES), args.jobs, args.debounce, args.poll)
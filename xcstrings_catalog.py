@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Shared engine for merging translation batches into Localizable.xcstrings
+Loads the catalog once, applies any number of sources in one pass and saves once
+"""
+
+import os
+import re
+import json
+import sys
+import unicodedata
+from translation_table import TranslationTable
+
+XCSTRINGS_PATH = "/Users/blargou/Desktop/removebgpro/removebgpro/Localizable.xcstrings"
+
+def load_xcstrings(filepath):
+    """Load the Localizable.xcstrings file"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# ICU's root collation order for ASCII punctuation and symbols, which is what Xcode sorts by
+PUNCTUATION_ORDER = "_-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$"
+NUMBER_PATTERN = re.compile(r"(\d+)")
+INDENT = "  "
+
+def _character_key(char):
+    if char.isspace():
+        return (0, ord(char))
+    if char in PUNCTUATION_ORDER:
+        return (1, PUNCTUATION_ORDER.index(char))
+    category = unicodedata.category(char)
+    if category[0] in "PS":
+        return (2, ord(char))
+    return (4, ord(char))
+
+def collation_key(key):
+    """Approximates Xcode's localizedStandardCompare order for string keys
+
+    Case and accents only break ties, and runs of digits compare by value ("9:16" before "16:9").
+    """
+    def primary(text):
+        parts = []
+        for chunk in NUMBER_PATTERN.split(text):
+            if chunk.isdigit():
+                parts.append((3, int(chunk)))
+                continue
+            base = unicodedata.normalize("NFD", chunk.casefold())
+            parts.extend(_character_key(c) for c in base if not unicodedata.combining(c))
+        return parts
+    return primary(key), key.swapcase()
+
+def _write_value(write, value, depth, sort_key=None):
+    if isinstance(value, dict):
+        if not value:
+            write("{\n\n" + INDENT * depth + "}")
+            return
+        inner = INDENT * (depth + 1)
+        write("{\n")
+        for index, key in enumerate(sorted(value, key=sort_key)):
+            if index:
+                write(",\n")
+            write(f"{inner}{json.dumps(key, ensure_ascii=False)} : ")
+            # Only the table of string keys uses Xcode's localized ordering; everything else is plain
+            _write_value(write, value[key], depth + 1, collation_key if depth == 0 and key == "strings" else None)
+        write("\n" + INDENT * depth + "}")
+    elif isinstance(value, list):
+        if not value:
+            write("[\n\n" + INDENT * depth + "]")
+            return
+        inner = INDENT * (depth + 1)
+        write("[\n")
+        for index, item in enumerate(value):
+            if index:
+                write(",\n")
+            write(inner)
+            _write_value(write, item, depth + 1)
+        write("\n" + INDENT * depth + "]")
+    else:
+        write(json.dumps(value, ensure_ascii=False))
+
+def write_xcstrings(f, data):
+    """Stream data to an open text file in Xcode's own .xcstrings layout"""
+    _write_value(f.write, data, 0)
+
+def save_xcstrings(filepath, data):
+    """Save the Localizable.xcstrings file through a temp file so Xcode never sees it half written"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        write_xcstrings(f, data)
+    os.replace(tmp_path, filepath)
+
+def translation_source(name, translations, add_missing=False):
+    """A batch of translations shaped {key: {lang: value}}
+    
+    With add_missing, keys that are not in the catalog yet are created as manual entries;
+    otherwise they are reported and skipped.
+    """
+    return {"name": name, "translations": translations, "add_missing": add_missing}
+
+def by_key(translations_by_language, keys=None):
+    """Turn {lang: {key: value}} into {key: {lang: value}}, optionally limited to keys"""
+    translations = {}
+    for lang_code, values in translations_by_language.items():
+        for key, value in values.items():
+            if keys is None or key in keys:
+                translations.setdefault(key, {})[lang_code] = value
+    return translations
+
+def merge_sources(sources):
+    """Merge sources in order (later ones win) and collect the keys they disagree on
+    
+    Returns (merged, add_missing, conflicts): merged is {key: {lang: value}}, add_missing the
+    keys some source allows to be created, and conflicts {(key, lang): [(source, value), ...]}.
+    """
+    merged = {}
+    origins = {}
+    add_missing = set()
+    conflicts = {}
+    
+    for source in sources:
+        for key, translations in source["translations"].items():
+            if source["add_missing"]:
+                add_missing.add(key)
+            values = merged.setdefault(key, {})
+            for lang_code, value in translations.items():
+                previous = values.get(lang_code)
+                if previous is not None and previous != value:
+                    history = conflicts.setdefault((key, lang_code), [origins[(key, lang_code)]])
+                    history.append((source["name"], value))
+                values[lang_code] = value
+                origins[(key, lang_code)] = (source["name"], value)
+    
+    return merged, add_missing, conflicts
+
+def apply_translations(table, merged, add_missing):
+    """Write merged translations into a TranslationTable and return statistics
+
+    Only cells whose value or state actually differ count as changed; stats["changed"] lists
+    them as (key, lang) so callers can skip saving when a merge was a no-op.
+    """
+    stats = {"keys_updated": 0, "keys_added": 0, "translations_added": 0, "unchanged": 0,
+             "missing_keys": [], "changed": []}
+    
+    for key, translations in merged.items():
+        if key not in table:
+            if key not in add_missing:
+                stats["missing_keys"].append(key)
+                continue
+            row = table.add_key(key, {"extractionState": "manual"})
+            table.has_localizations[row] = True
+            stats["keys_added"] += 1
+        
+        changed = [lang_code for lang_code, translation in translations.items()
+                   if table.set(key, lang_code, translation)]
+        stats["unchanged"] += len(translations) - len(changed)
+        if not changed:
+            continue
+        stats["changed"].extend((key, lang_code) for lang_code in changed)
+        stats["keys_updated"] += 1
+        stats["translations_added"] += len(changed)
+    
+    return stats
+
+def print_conflicts(conflicts):
+    if not conflicts:
+        return
+    print(f"\n⚠️  {len(conflicts)} conflicting translations (last source wins):")
+    for (key, lang_code), history in sorted(conflicts.items()):
+        print(f"   '{key}' [{lang_code}]")
+        for name, value in history:
+            print(f"      {name}: {value!r}")
+
+def apply_sources(filepath, sources):
+    """Load the catalog, apply every source in one pass and save it once"""
+    print(f"Loading {filepath}...")
+    table = TranslationTable.from_xcstrings(load_xcstrings(filepath))
+    
+    merged, add_missing, conflicts = merge_sources(sources)
+    stats = apply_translations(table, merged, add_missing)
+    for key in stats["missing_keys"]:
+        print(f"Warning: Key '{key}' not found in xcstrings file")
+    
+    if stats["changed"] or stats["keys_added"]:
+        print(f"Saving {filepath}...")
+        save_xcstrings(filepath, table.to_xcstrings())
+    else:
+        print(f"Nothing changed, leaving {filepath} untouched")
+    
+    print(f"\n✅ Success!")
+    print(f"   Applied {len(sources)} sources")
+    print(f"   Updated {stats['keys_updated']} keys ({stats['keys_added']} new)")
+    print(f"   Added {stats['translations_added']} translations ({stats['unchanged']} already up to date)")
+    print_conflicts(conflicts)
+    return stats, conflicts
+
+def default_sources():
+    """Every translation script's batch, in the order they were originally run"""
+    import add_translations
+    import add_all_translations
+    import add_missing_translations
+    import add_home_translations
+    import add_journey_translation
+    
+    return [
+        add_translations.source(),
+        add_all_translations.source(),
+        add_missing_translations.source(),
+        add_home_translations.source(),
+        add_journey_translation.source()
+    ]
+
+if __name__ == "__main__":
+    filepath = sys.argv[1] if len(sys.argv) > 1 else XCSTRINGS_PATH
+    apply_sources(filepath, default_sources())